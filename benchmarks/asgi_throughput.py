@@ -0,0 +1,211 @@
+"""Пропускная способность и хвосты задержек под ASGI: sync против async.
+
+Запуск из корня репозитория:
+
+    python benchmarks/asgi_throughput.py --posts 10000 --concurrency 32
+
+Запросы подаются прямо в ASGI-приложение Django (`get_asgi_application`)
+из `--concurrency` одновременных клиентов, без сети. Каждый режим
+(`BLOG_ASYNC_VIEWS` выключен и включён) запускается в своём процессе,
+база создаётся так же, как в `http_latency.py`. Полностраничный кеш по
+умолчанию выключен, иначе замеряется только чтение из кеша.
+
+SQLite отвечает за доли миллисекунды, и обе реализации упираются в
+рендер шаблонов. `--query-delay` добавляет к каждому SQL-запросу
+задержку, как у сетевой СУБД; именно её асинхронные представления
+перекрывают.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT_DIR / 'blogicum'), str(ROOT_DIR)]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+from benchmarks.http_latency import (  # noqa: E402
+    git_commit,
+    percentile,
+    prepare_database,
+    sample_kwargs,
+)
+from django.conf import settings  # noqa: E402
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.db.backends.signals import connection_created  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+MODES = ('sync', 'async')
+
+
+def workload(values):
+    """Маршруты, у которых есть асинхронный вариант."""
+    return [
+        reverse('blog:index'),
+        reverse('blog:index') + '?page=3',
+        reverse('blog:post_detail', kwargs={'post_id': values['post_id']}),
+        reverse('blog:category_posts', kwargs={'slug': values['slug']}),
+        reverse('blog:profile', kwargs={'username': values['username']}),
+    ]
+
+
+async def request(application, url):
+    parts = urlsplit(url)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': parts.path,
+        'raw_path': parts.path.encode(),
+        'query_string': parts.query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    status = None
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+async def load(application, urls, concurrency, duration, warmup):
+    for url in urls * warmup:
+        await request(application, url)
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + duration
+
+    async def client(offset):
+        position = offset
+        while time.perf_counter() < deadline:
+            url = urls[position % len(urls)]
+            position += 1
+            started = time.perf_counter()
+            status = await request(application, url)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'statuses': statuses,
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+    }
+
+
+def delay_queries(seconds):
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+    connection_created.connect(install, weak=False)
+
+
+def run_mode(options):
+    assert settings.BLOG_ASYNC_VIEWS == (options.mode == 'async')
+    if not options.page_cache:
+        settings.PAGE_CACHE_TIMEOUT = 0
+    settings.BLOG_CURSOR_PAGINATION = options.cursor_pagination
+    if options.query_delay:
+        delay_queries(options.query_delay / 1000)
+    prepare_database(options.posts, reseed=False)
+    _, values = sample_kwargs(random.Random(options.seed))
+    application = get_asgi_application()
+    return asyncio.run(load(
+        application, workload(values), options.concurrency,
+        options.duration, options.warmup
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=10_000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--page-cache', action='store_true')
+    parser.add_argument(
+        '--cursor-pagination', action='store_true',
+        help='Keyset-пагинация лент: без COUNT и списка номеров страниц.'
+    )
+    parser.add_argument(
+        '--query-delay', type=float, default=0.0,
+        help='Задержка каждого SQL-запроса, мс (имитация сетевой СУБД).'
+    )
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+    if 'BENCHMARK_DB' not in os.environ:
+        os.environ['BENCHMARK_DB'] = str(
+            Path(settings.DATABASES['default']['NAME']).with_name(
+                f'blogicum-{options.posts}.sqlite3'
+            )
+        )
+        settings.DATABASES['default']['NAME'] = os.environ['BENCHMARK_DB']
+
+    if options.mode:
+        print(json.dumps(run_mode(options)))
+        return
+
+    # Выбор представлений фиксируется при импорте urls, поэтому каждый
+    # режим замеряется в отдельном процессе.
+    prepare_database(options.posts, reseed=False)
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, *sys.argv[1:], '--mode', mode],
+            check=True, capture_output=True, text=True, env={
+                **os.environ,
+                'BENCHMARK_ASYNC_VIEWS': '1' if mode == 'async' else '0',
+            },
+        ).stdout
+        results[mode] = json.loads(output.splitlines()[-1])
+    report = json.dumps({
+        'meta': {
+            'commit': git_commit(),
+            'posts': options.posts,
+            'concurrency': options.concurrency,
+            'duration': options.duration,
+            'page_cache': options.page_cache,
+            'query_delay_ms': options.query_delay,
+            'cursor_pagination': options.cursor_pagination,
+            'timestamp': time.time(),
+        },
+        'modes': results,
+    }, ensure_ascii=False, indent=2)
+    if options.output:
+        options.output.write_text(report, encoding='utf-8')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
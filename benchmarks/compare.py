@@ -0,0 +1,40 @@
+"""Сравнение двух отчётов `http_latency.py`.
+
+    python benchmarks/compare.py before.json after.json --threshold 0.1
+
+Код возврата 1, если p95 какого-либо маршрута вырос больше порога
+или выросло число SQL-запросов.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before', type=Path)
+    parser.add_argument('after', type=Path)
+    parser.add_argument('--threshold', type=float, default=0.1)
+    options = parser.parse_args()
+    before = json.loads(options.before.read_text(encoding='utf-8'))['routes']
+    after = json.loads(options.after.read_text(encoding='utf-8'))['routes']
+
+    regressed = False
+    print(f'{"route":48} {"p95 before":>11} {"p95 after":>10} '
+          f'{"change":>8} {"queries":>9}')
+    for route in sorted(before.keys() & after.keys()):
+        old, new = before[route], after[route]
+        change = (new['p95_ms'] - old['p95_ms']) / (old['p95_ms'] or 1)
+        marker = ''
+        if change > options.threshold or new['queries'] > old['queries']:
+            regressed = True
+            marker = '  <-- regression'
+        print(f'{route:48} {old["p95_ms"]:>11.2f} {new["p95_ms"]:>10.2f} '
+              f'{change:>+8.0%} {old["queries"]:>4}->{new["queries"]:<4}'
+              f'{marker}')
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
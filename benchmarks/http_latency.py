@@ -0,0 +1,228 @@
+"""Бенчмарк задержек HTTP по всем именованным маршрутам blog и pages.
+
+Запуск из корня репозитория:
+
+    python benchmarks/http_latency.py --posts 10000 --output bench.json
+
+База для каждого масштаба создаётся один раз в `benchmarks/data/`
+и переиспользуется (`--reseed` создаёт её заново). Запросы идут через
+тестовый клиент Django; для каждого маршрута и типа клиента замеряются
+p50/p95/p99 задержки, число SQL-запросов и выделения памяти. Результат —
+JSON, который сравнивает `benchmarks/compare.py`.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT_DIR / 'blogicum'), str(ROOT_DIR)]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, reset_queries  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils.http import urlencode  # noqa: E402
+
+from blog import urls as blog_urls  # noqa: E402
+from blog.models import Comment, Post  # noqa: E402
+from pages import urls as pages_urls  # noqa: E402
+
+# Маршруты, доступные только автору: их замеряем авторизованным клиентом.
+AUTHOR_ROUTES = {
+    'blog:create_post', 'blog:edit_post', 'blog:delete_post',
+    'blog:edit_comment', 'blog:delete_comment', 'blog:edit_profile',
+}
+# GET-параметры маршрутов, которым без них нечего показать.
+ROUTE_QUERIES = {'blog:search': ('q',)}
+# Обработчики только для POST: GET-замер для них ничего не говорит.
+POST_ONLY_ROUTES = {'blog:add_comment'}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def prepare_database(n_posts, reseed):
+    db_path = Path(settings.DATABASES['default']['NAME'])
+    if reseed and db_path.exists():
+        db_path.unlink()
+    if db_path.exists():
+        return
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    call_command('migrate', verbosity=0)
+    started = time.perf_counter()
+    call_command(
+        'seed_blog',
+        posts=n_posts,
+        users=max(n_posts // 50, 10),
+        categories=max(n_posts // 10_000, 5),
+        locations=max(n_posts // 5_000, 5),
+        seed=0,
+        stdout=sys.stderr,
+    )
+    print(
+        f'Seeded {n_posts} posts in {time.perf_counter() - started:.1f}s',
+        file=sys.stderr,
+    )
+
+
+def sample_kwargs(rng):
+    post = Post.objects.published().filter(
+        pk__gte=rng.randint(1, Post.objects.count() or 1),
+        comment_count__gt=0,
+    ).select_related('author').first() or Post.objects.published().first()
+    # Страницы правки комментария доступны только его автору.
+    comment = Comment.objects.filter(
+        post=post, author=post.author
+    ).first() or Comment.objects.create(
+        post=post, author=post.author, text='Комментарий автора'
+    )
+    return post.author, {
+        'post_id': post.pk,
+        'comment_id': comment.pk,
+        'slug': post.category.slug,
+        'username': post.author.username,
+        'q': post.title,
+    }
+
+
+def named_routes():
+    for module in (blog_urls, pages_urls):
+        for pattern in module.urlpatterns:
+            name = f'{module.app_name}:{pattern.name}'
+            if pattern.name and name not in POST_ONLY_ROUTES:
+                yield name, pattern
+
+
+def route_url(name, pattern, values):
+    kwargs = {key: values[key] for key in pattern.pattern.converters}
+    url = reverse(name, kwargs=kwargs)
+    if name in ROUTE_QUERIES:
+        url += '?' + urlencode(
+            {key: values[key] for key in ROUTE_QUERIES[name]}
+        )
+    return url
+
+
+def measure(client, url, iterations, warmup):
+    for _ in range(warmup):
+        client.get(url)
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = client.get(url)
+        latencies.append((time.perf_counter() - started) * 1000)
+    # Журнал запросов очищается в начале каждого запроса (request_started),
+    # поэтому начинаем замер с пустого журнала.
+    reset_queries()
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+    n_queries = len(ctx.captured_queries)
+    tracemalloc.start()
+    client.get(url)
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'url': url,
+        'status': response.status_code,
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'queries': n_queries,
+        'alloc_bytes': allocated,
+        'alloc_peak_bytes': peak,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(options):
+    prepare_database(options.posts, options.reseed)
+    rng = random.Random(options.seed)
+    author, values = sample_kwargs(rng)
+    clients = {
+        'anonymous': Client(raise_request_exception=False),
+        'author': Client(raise_request_exception=False),
+    }
+    clients['author'].force_login(author)
+
+    results = {}
+    for name, pattern in named_routes():
+        url = route_url(name, pattern, values)
+        for client_name, client in clients.items():
+            if name in AUTHOR_ROUTES and client_name == 'anonymous':
+                continue
+            results[f'{name} [{client_name}]'] = measure(
+                client, url, options.iterations, options.warmup
+            )
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'posts': options.posts,
+            'iterations': options.iterations,
+            'page_cache': not options.no_page_cache,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'timestamp': time.time(),
+        },
+        'routes': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=10_000)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reseed', action='store_true')
+    parser.add_argument('--output', type=Path)
+    parser.add_argument(
+        '--no-page-cache', action='store_true',
+        help='Отключить полностраничный кеш для анонимных запросов.'
+    )
+    options = parser.parse_args()
+    if options.no_page_cache:
+        settings.PAGE_CACHE_TIMEOUT = 0
+    if 'BENCHMARK_DB' not in os.environ:
+        settings.DATABASES['default']['NAME'] = str(
+            Path(settings.DATABASES['default']['NAME']).with_name(
+                f'blogicum-{options.posts}.sqlite3'
+            )
+        )
+    report = json.dumps(run(options), ensure_ascii=False, indent=2)
+    if options.output:
+        options.output.write_text(report, encoding='utf-8')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
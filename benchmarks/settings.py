@@ -0,0 +1,23 @@
+import os
+from pathlib import Path
+
+from blogicum.settings import *  # noqa: F401,F403
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'BENCHMARK_DB', str(BENCHMARK_DIR / 'data' / 'blogicum.sqlite3')
+        ),
+    }
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Выбор представлений фиксируется при импорте urls, поэтому задаётся
+# окружением процесса (см. `asgi_throughput.py`).
+BLOG_ASYNC_VIEWS = os.environ.get('BENCHMARK_ASYNC_VIEWS') == '1'
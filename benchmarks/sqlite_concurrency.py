@@ -0,0 +1,214 @@
+"""Чтение лент под потоком записи комментариев: профили SQLite.
+
+Запуск из корня репозитория:
+
+    python benchmarks/sqlite_concurrency.py --posts 10000 --readers 4
+
+Для каждого профиля база из `benchmarks/data/` копируется заново.
+Отдельный процесс добавляет комментарии через ORM (с сигналами, как
+представление) в транзакциях, которые держат блокировку записи
+`--hold` мс, как долгая пакетная правка, и делают паузу `--pause` мс
+между ними. `--readers` потоков тем временем читают главную, категорию
+и страницу поста. `baseline` — настройки SQLite по умолчанию (журнал
+отката, synchronous=FULL): пока держится блокировка, чтение ждёт.
+`tuned` — `PRODUCTION_SQLITE_PRAGMAS` из настроек проекта: в режиме WAL
+чтение не ждёт записи. В отчёте задержки чтения, число ошибок
+«database is locked» и скорость записи.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT_DIR / 'blogicum'), str(ROOT_DIR)]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+from benchmarks.http_latency import (  # noqa: E402
+    git_commit,
+    percentile,
+    prepare_database,
+    sample_kwargs,
+)
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import OperationalError, connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from blog.models import Comment  # noqa: E402
+
+PROFILES = {
+    'baseline': {'journal_mode': 'delete', 'synchronous': 'full'},
+    'tuned': settings.PRODUCTION_SQLITE_PRAGMAS,
+}
+
+
+def write_comments(post_id, author_id, deadline, options, results):
+    written = errors = 0
+    connection = connections['default']
+    connection.ensure_connection()
+    while time.time() < deadline:
+        # BEGIN EXCLUSIVE сразу берёт блокировку, которую обычная
+        # транзакция берёт только при записи в файл базы: в журнале
+        # отката она закрывает базу и для чтения. atomic() так не умеет,
+        # поэтому транзакция открывается вручную.
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('BEGIN EXCLUSIVE')
+                try:
+                    for _ in range(options.batch):
+                        Comment.objects.create(
+                            post_id=post_id, author_id=author_id,
+                            text='Комментарий под нагрузкой',
+                        )
+                    time.sleep(options.hold / 1000)
+                    cursor.execute('COMMIT')
+                except BaseException:
+                    cursor.execute('ROLLBACK')
+                    raise
+            written += options.batch
+        except OperationalError:
+            errors += 1
+        time.sleep(options.pause / 1000)
+    connections.close_all()
+    results.put({'comments': written, 'errors': errors})
+
+
+def read_feeds(urls, deadline, latencies, errors):
+    client = Client(raise_request_exception=False)
+    position = random.randrange(len(urls))
+    while time.time() < deadline:
+        url = urls[position % len(urls)]
+        position += 1
+        started = time.perf_counter()
+        response = client.get(url)
+        if response.status_code == 200:
+            latencies.append((time.perf_counter() - started) * 1000)
+        else:
+            errors.append(response.status_code)
+    connections.close_all()
+
+
+def run_profile(options):
+    settings.SQLITE_PRAGMAS = PROFILES[options.profile]
+    settings.PAGE_CACHE_TIMEOUT = 0
+    author, values = sample_kwargs(random.Random(options.seed))
+    urls = [
+        reverse('blog:index'),
+        reverse('blog:category_posts', kwargs={'slug': values['slug']}),
+        reverse('blog:post_detail', kwargs={'post_id': values['post_id']}),
+    ]
+    # Дочерний процесс не должен унаследовать открытое соединение.
+    connections.close_all()
+    deadline = time.time() + options.duration
+    results = multiprocessing.Queue()
+    writer = multiprocessing.Process(target=write_comments, args=(
+        values['post_id'], author.pk, deadline, options, results
+    ))
+    writer.start()
+    latencies, errors = [], []
+    readers = [
+        threading.Thread(
+            target=read_feeds, args=(urls, deadline, latencies, errors)
+        )
+        for _ in range(options.readers)
+    ]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    writes = results.get()
+    writer.join()
+    return {
+        'reads': len(latencies),
+        'read_errors': len(errors),
+        'reads_per_s': round(len(latencies) / options.duration, 1),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(max(latencies), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'comments_per_s': round(writes['comments'] / options.duration, 1),
+        'write_errors': writes['errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=10_000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument(
+        '--batch', type=int, default=10,
+        help='Комментариев в одной транзакции записи.'
+    )
+    parser.add_argument(
+        '--hold', type=float, default=50.0,
+        help='Сколько мс транзакция записи держит блокировку.'
+    )
+    parser.add_argument(
+        '--pause', type=float, default=50.0,
+        help='Пауза между транзакциями записи, мс.'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path)
+    parser.add_argument(
+        '--profile', choices=PROFILES, help=argparse.SUPPRESS
+    )
+    options = parser.parse_args()
+
+    if options.profile:
+        print(json.dumps(run_profile(options)))
+        return
+
+    source = Path(settings.DATABASES['default']['NAME']).with_name(
+        f'blogicum-{options.posts}.sqlite3'
+    )
+    settings.DATABASES['default']['NAME'] = str(source)
+    prepare_database(options.posts, reseed=False)
+    # База могла быть создана до последних миграций.
+    call_command('migrate', verbosity=0)
+    connections.close_all()
+    results = {}
+    for profile in PROFILES:
+        # Режим журнала хранится в файле: каждому профилю — своя копия.
+        database = source.with_name(f'concurrency-{profile}.sqlite3')
+        for suffix in ('', '-wal', '-shm'):
+            Path(f'{database}{suffix}').unlink(missing_ok=True)
+        shutil.copyfile(source, database)
+        output = subprocess.run(
+            [sys.executable, __file__, *sys.argv[1:], '--profile', profile],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, 'BENCHMARK_DB': str(database)},
+        ).stdout
+        results[profile] = json.loads(output.splitlines()[-1])
+    report = json.dumps({
+        'meta': {
+            'commit': git_commit(),
+            'posts': options.posts,
+            'readers': options.readers,
+            'duration': options.duration,
+            'batch': options.batch,
+            'hold_ms': options.hold,
+            'pause_ms': options.pause,
+            'timestamp': time.time(),
+        },
+        'profiles': results,
+    }, ensure_ascii=False, indent=2)
+    if options.output:
+        options.output.write_text(report, encoding='utf-8')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,114 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.utils import timezone
 
-from .models import Category, Comment, Location, Post
+from .caches import (
+    bump_dependencies,
+    mark_posts_removed,
+    post_dependencies,
+)
+from .models import Category, Comment, ImageJob, Location, Post
+from .paginators import EstimatedCountPaginator
+
+User = get_user_model()
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Список без полного `COUNT(*)` и сортировка по первичному ключу."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-id', )
+    # Строка поиска показывается при непустом search_fields, а ищет
+    # get_search_results: `=author__username` дал бы iexact, то есть LIKE
+    # мимо уникального индекса логина.
+    search_fields = ('author__username', )
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        conditions = self.search_conditions(search_term)
+        if not conditions:
+            return queryset.none(), False
+        condition = Q()
+        for part in conditions:
+            condition |= part
+        return queryset.filter(condition), False
+
+    def search_conditions(self, search_term):
+        """Условия поиска, каждое по своему индексу; объединяются OR."""
+        author_id = User.objects.filter(username=search_term).values_list(
+            'pk', flat=True
+        ).first()
+        return [Q(author_id=author_id)] if author_id else []
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    pass
+    list_display = ('title', 'slug', 'is_published')
+    search_fields = ('title', 'slug')
 
 
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
-    pass
+    list_display = ('name', 'is_published')
+    search_fields = ('name', )
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
-    pass
+class PostAdmin(LargeTableAdmin):
+    list_display = (
+        'title', 'author', 'category', 'location', 'pub_date',
+        'is_published', 'comment_count'
+    )
+    list_select_related = ('author', 'category', 'location')
+    list_filter = ('is_published', 'category')
+    raw_id_fields = ('author', )
+    autocomplete_fields = ('category', 'location')
+    readonly_fields = ('comment_count', 'image_derivatives')
+    actions = ('publish', 'unpublish')
+
+    def search_conditions(self, search_term):
+        return super().search_conditions(search_term) + [
+            Q(pk__in=Post.objects.search(search_term).values('pk'))
+        ]
+
+    @admin.action(description='Опубликовать выбранные публикации')
+    def publish(self, request, queryset):
+        self.set_published(request, queryset, True)
+
+    @admin.action(description='Снять выбранные публикации с публикации')
+    def unpublish(self, request, queryset):
+        self.set_published(request, queryset, False)
+
+    def set_published(self, request, queryset, is_published):
+        # Один UPDATE вместо сохранения каждого поста; сигналы при этом не
+        # срабатывают, поэтому кеш страниц сбрасывается здесь.
+        changed = queryset.exclude(is_published=is_published).order_by()
+        rows = list(changed.values_list('pk', 'category_id', 'author_id'))
+        updated = changed.update(
+            is_published=is_published, updated_at=timezone.now()
+        )
+        if rows and not is_published:
+            mark_posts_removed()
+        bump_dependencies(*{
+            dependency for row in rows
+            for dependency in post_dependencies(*row)
+        })
+        self.message_user(request, f'Изменено публикаций: {updated}.')
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
-    pass
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('__str__', 'post', 'author', 'created_at')
+    list_select_related = ('post', 'author')
+    raw_id_fields = ('post', 'author')
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('image', 'status', 'attempts', 'created_at')
+    list_filter = ('status', )
+    raw_id_fields = ('post', )
@@ -1,7 +1,22 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+from .fts import ensure_search_triggers
+from .sqlite import configure_sqlite
+
+
+def restore_search_triggers(sender, using, **kwargs):
+    ensure_search_triggers(connections[using])
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+        post_migrate.connect(restore_search_triggers, sender=self)
+        connection_created.connect(configure_sqlite)
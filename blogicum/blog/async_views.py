@@ -0,0 +1,233 @@
+"""Асинхронные варианты страниц только для чтения.
+
+ORM в Django 3.2 синхронный, поэтому независимые запросы страницы
+выполняются параллельно в отдельных потоках, каждый со своим
+соединением. Включаются настройкой `BLOG_ASYNC_VIEWS` и имеет смысл
+только под ASGI.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage, Paginator
+from django.db import close_old_connections
+from django.http import Http404, HttpResponseNotAllowed
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+
+from .caches import (
+    card_dependencies,
+    dependency_versions,
+    get_cached_page,
+    get_published_category,
+    page_cache_key,
+)
+from .conditional import (
+    conditional,
+    feed_validators,
+    post_response_validators,
+    post_validators,
+)
+from .forms import CommentForm
+from .mixins import get_comment_page, store_rendered_page
+from .models import Post, User
+from .paginators import CursorPaginator, InvalidCursor
+
+PAGINATE_BY = 10
+
+
+def _run_and_close(function):
+    try:
+        return function()
+    finally:
+        # Поток не обслуживает request_finished: соединение закрываем
+        # сами, с учётом CONN_MAX_AGE.
+        close_old_connections()
+
+
+@lru_cache(maxsize=None)
+def query_executor():
+    # Пул цикла событий по умолчанию — cpu_count + 4 потока: на малом
+    # числе ядер он ограничил бы параллельность ожидания ответов БД.
+    return ThreadPoolExecutor(
+        max_workers=settings.BLOG_ASYNC_QUERY_THREADS,
+        thread_name_prefix='blog-query'
+    )
+
+
+def in_thread(function, *args, **kwargs):
+    """Запускает синхронную функцию в отдельном потоке пула."""
+    return sync_to_async(
+        _run_and_close, thread_sensitive=False, executor=query_executor()
+    )(partial(function, *args, **kwargs))
+
+
+def read_only(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        # Пользователь загружается из сессии лениво: до первого обращения
+        # в асинхронном коде его нужно получить в потоке.
+        await sync_to_async(lambda: request.user.is_authenticated)()
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def paginate(request, queryset, per_page=PAGINATE_BY):
+    """Страница списка; подсчёт и выборка строк идут параллельно."""
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after or before or settings.BLOG_CURSOR_PAGINATION:
+        paginator = CursorPaginator(queryset, per_page)
+        try:
+            return await in_thread(paginator.page, after=after, before=before)
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+
+    paginator = Paginator(queryset, per_page)
+    number = request.GET.get('page') or 1
+    if number == 'last':
+        paginator.count = await in_thread(queryset.count)
+        number, rows = paginator.num_pages, None
+    else:
+        try:
+            number = int(number)
+        except ValueError:
+            raise Http404('Invalid page')
+        offset = (max(number, 1) - 1) * per_page
+        paginator.count, rows = await asyncio.gather(
+            in_thread(queryset.count),
+            in_thread(lambda: list(queryset[offset:offset + per_page])),
+        )
+    try:
+        page = paginator.page(number)
+    except InvalidPage:
+        raise Http404('Invalid page')
+    if rows is None:
+        rows = await in_thread(list, page.object_list)
+    page.object_list = rows
+    return page
+
+
+def list_context(page):
+    return {
+        'paginator': getattr(page, 'paginator', None),
+        'page_obj': page,
+        'is_paginated': page.has_other_pages(),
+        'object_list': page.object_list,
+        'post_list': page.object_list,
+    }
+
+
+def page_card_dependencies(context):
+    return [
+        dependency for post in context['page_obj']
+        for dependency in card_dependencies(post)
+    ]
+
+
+def anonymous_page_cache(get_dependencies=lambda kwargs: [],
+                         get_rendered_dependencies=lambda context: [],
+                         until_next_publication=False):
+    """Асинхронный аналог `AnonymousPageCacheMixin`."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.user.is_authenticated:
+                return await view(request, *args, **kwargs)
+            key = page_cache_key(request)
+            cached = await sync_to_async(get_cached_page)(key)
+            if cached is not None:
+                return cached
+            versions = await sync_to_async(dependency_versions)(
+                get_dependencies(kwargs)
+            )
+            response = await view(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.add_post_render_callback(partial(
+                    store_rendered_page, key, versions,
+                    get_rendered_dependencies, until_next_publication
+                ))
+            return response
+        return wrapper
+    return decorator
+
+
+@read_only
+@conditional(feed_validators)
+@anonymous_page_cache(
+    lambda kwargs: ['index'], page_card_dependencies,
+    until_next_publication=True
+)
+async def index(request):
+    page = await paginate(request, Post.objects.feed())
+    return TemplateResponse(request, 'blog/index.html', list_context(page))
+
+
+@read_only
+@conditional(feed_validators)
+@anonymous_page_cache(
+    get_rendered_dependencies=lambda context: [
+        f'category:{context["category"].pk}'
+    ] + page_card_dependencies(context),
+    until_next_publication=True
+)
+async def category_posts(request, slug):
+    # Лента фильтруется по slug, поэтому не ждёт поиска категории.
+    category, page = await asyncio.gather(
+        in_thread(get_published_category, slug),
+        paginate(request, Post.objects.filter(category__slug=slug).feed()),
+    )
+    if category is None:
+        raise Http404('Category not found')
+    return TemplateResponse(request, 'blog/category.html', {
+        **list_context(page), 'category': category,
+    })
+
+
+@read_only
+@conditional(feed_validators)
+async def profile(request, username):
+    posts = Post.objects.filter(author__username=username)
+    profile_user, page = await asyncio.gather(
+        in_thread(get_object_or_404, User, username=username),
+        paginate(request, posts.feed(
+            only_published=request.user.get_username() != username
+        )),
+    )
+    return TemplateResponse(request, 'blog/profile.html', {
+        **list_context(page), 'profile': profile_user,
+    })
+
+
+def _post_detail_dependencies(context):
+    post = context['post']
+    return [f'category:{post.category_id}', *card_dependencies(post)] + [
+        f'user:{comment.author_id}' for comment in context['comments']
+    ]
+
+
+@read_only
+@conditional(post_validators, post_response_validators)
+@anonymous_page_cache(
+    lambda kwargs: [f'post:{kwargs["post_id"]}'], _post_detail_dependencies
+)
+async def post_detail(request, post_id):
+    # Комментарии читаются параллельно с постом и отбрасываются, если пост
+    # не виден пользователю.
+    post, comments = await asyncio.gather(
+        in_thread(
+            get_object_or_404, Post.objects.visible_to(request.user),
+            pk=post_id
+        ),
+        in_thread(get_comment_page, post_id),
+    )
+    return TemplateResponse(request, 'blog/detail.html', {
+        'object': post,
+        'post': post,
+        'form': CommentForm(),
+        'comments': comments,
+    })
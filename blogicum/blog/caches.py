@@ -0,0 +1,178 @@
+import hashlib
+from collections import Counter
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Category
+from .routers import reading_from_replica
+
+POST_CARD_TEMPLATE = 'includes/post_card.html'
+CACHED_PAGE_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+POSTS_REMOVED_KEY = 'posts_removed_at'
+
+post_card_stats = Counter(hits=0, misses=0)
+# Справочники в памяти процесса: {имя: (версия, объекты)}.
+_process_objects = {}
+
+
+def post_card_version(post):
+    """Версия содержимого карточки: всё, что попадает в её разметку.
+
+    Ключ меняется вместе с постом, его категорией, местоположением и
+    именем автора, поэтому устаревшие карточки просто перестают читаться.
+    """
+    category = post.category
+    location = post.location
+    parts = (
+        post.title, post.text, post.pub_date.isoformat(), post.is_published,
+        post.image.name if post.image else '', post.comment_count,
+        repr(post.image_derivatives),
+        category.pk, category.slug, category.title, category.is_published,
+        location and (location.pk, location.name, location.is_published),
+        post.author.username,
+    )
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def render_post_card(post):
+    key = f'post_card:{post.pk}:{post_card_version(post)}'
+    html = cache.get(key)
+    if html is not None:
+        post_card_stats['hits'] += 1
+        return html
+    post_card_stats['misses'] += 1
+    html = render_to_string(POST_CARD_TEMPLATE, {'post': post})
+    cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return html
+
+
+def get_published_category(slug):
+    """Опубликованная категория по slug или None — без запроса к БД.
+
+    Словарь хранится в памяти процесса; из общего кеша читается только
+    версия зависимости `choices:category`.
+    """
+    categories = _process_cached(
+        'published_categories', 'choices:category',
+        lambda: {
+            category.slug: category
+            for category in Category.objects.filter(is_published=True)
+        }
+    )
+    return categories.get(slug)
+
+
+def card_dependencies(post):
+    dependencies = [f'user:{post.author_id}']
+    if post.location_id:
+        dependencies.append(f'location:{post.location_id}')
+    return dependencies
+
+
+def post_dependencies(post_id, category_id, author_id):
+    """Страницы и ленты, в которых выводится пост."""
+    return {
+        'index', f'post:{post_id}', f'category:{category_id}',
+        'feed', f'feed:category:{category_id}', f'feed:user:{author_id}',
+    }
+
+
+def _dependency_key(dependency):
+    return f'page_dependency:{dependency}'
+
+
+def bump_dependencies(*dependencies):
+    """Инвалидирует все страницы, зависящие от перечисленных объектов."""
+    token = uuid4().hex
+    cache.set_many(
+        {_dependency_key(dependency): token for dependency in dependencies},
+        None
+    )
+
+
+def dependency_versions(dependencies):
+    keys = {_dependency_key(dependency): dependency
+            for dependency in dependencies}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, uuid4().hex, None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def mark_posts_removed():
+    """Запоминает, когда посты ушли из лент.
+
+    MAX(updated_at) удалённых постов не видит, а Last-Modified лент
+    должен меняться и для клиентов, присылающих только If-Modified-Since.
+    """
+    cache.set(POSTS_REMOVED_KEY, timezone.now(), None)
+
+
+def posts_removed_at():
+    return cache.get(POSTS_REMOVED_KEY)
+
+
+def _process_cached(name, dependency, load):
+    """Результат `load()` из памяти процесса, пока версия не сменилась.
+
+    Версия хранится в общем кеше, поэтому правка в одном процессе
+    сбрасывает копии во всех остальных.
+    """
+    version = dependency_versions([dependency])[dependency]
+    cached = _process_objects.get(name)
+    if cached is None or cached[0] != version:
+        cached = version, load()
+        _process_objects[name] = cached
+    return cached[1]
+
+
+def cached_objects(queryset):
+    """Все объекты справочника из памяти процесса в виде {pk: объект}.
+
+    Список сбрасывается вместе с зависимостью `choices:<модель>`.
+    """
+    dependency = f'choices:{queryset.model._meta.model_name}'
+    return _process_cached(
+        dependency, dependency,
+        lambda: {obj.pk: obj for obj in queryset.all()}
+    )
+
+
+def page_cache_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'page:{path}'
+
+
+def get_cached_page(key):
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    content, headers, versions = entry
+    if isinstance(headers, str):
+        # Записи, сохранённые до появления валидаторов.
+        headers = {'Content-Type': headers}
+    current = cache.get_many(
+        [_dependency_key(dependency) for dependency in versions]
+    )
+    for dependency, version in versions.items():
+        if current.get(_dependency_key(dependency)) != version:
+            return None
+    return HttpResponse(content, headers=headers)
+
+
+def store_page(key, response, versions, timeout):
+    # Отстающая реплика могла отдать данные старше версий зависимостей:
+    # такая страница пережила бы инвалидацию, которая уже прошла.
+    if timeout <= 0 or reading_from_replica():
+        return
+    headers = {
+        header: response[header] for header in CACHED_PAGE_HEADERS
+        if response.has_header(header)
+    }
+    cache.set(key, (response.content, headers, versions), timeout)
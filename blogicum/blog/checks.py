@@ -0,0 +1,93 @@
+"""Проверки настроек, заметно замедляющих продакшен.
+
+Запускаются `manage.py check --deploy --tag performance`; в профиле
+production `ensure_fast_settings` выполняет их при создании WSGI/ASGI
+приложения и не даёт принять трафик, пока есть ошибки.
+"""
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+MANIFEST_STORAGES = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage',
+)
+
+
+def _uses_cached_loader(engine):
+    return any(
+        loader[0] == 'django.template.loaders.cached.Loader'
+        for loader in engine.engine.loaders if isinstance(loader, tuple)
+    )
+
+
+@checks.register('performance', deploy=True)
+def check_performance_settings(app_configs, **kwargs):
+    errors = []
+    if settings.DEBUG:
+        errors.append(checks.Error(
+            'DEBUG включён: запросы к БД копятся в памяти, а шаблоны не'
+            ' кешируются.',
+            id='blog.E001',
+        ))
+    if any(
+        isinstance(engine, DjangoTemplates)
+        and not _uses_cached_loader(engine)
+        for engine in engines.all()
+    ):
+        errors.append(checks.Error(
+            'Шаблоны загружаются без django.template.loaders.cached.Loader.',
+            id='blog.E002',
+        ))
+    if settings.CACHES['default']['BACKEND'] in PER_PROCESS_CACHES:
+        errors.append(checks.Error(
+            'Кеш default хранится в памяти процесса: сброс страниц и лент'
+            ' не дойдёт до остальных процессов.',
+            hint='Задайте BLOGICUM_CACHE_BACKEND и BLOGICUM_CACHE_LOCATION.',
+            id='blog.E003',
+        ))
+    for alias, database in settings.DATABASES.items():
+        if not database.get('CONN_MAX_AGE'):
+            errors.append(checks.Error(
+                f'База {alias} открывает соединение на каждый запрос.',
+                hint='Задайте CONN_MAX_AGE.',
+                id='blog.E004',
+            ))
+    if settings.STATICFILES_STORAGE not in MANIFEST_STORAGES:
+        errors.append(checks.Warning(
+            'Статика без хешей в именах не кешируется браузером надолго.',
+            id='blog.W001',
+        ))
+    if settings.SESSION_ENGINE == 'django.contrib.sessions.backends.db':
+        errors.append(checks.Warning(
+            'Сессия читается из БД на каждом запросе.',
+            hint='Используйте backends.cached_db или backends.cache.',
+            id='blog.W002',
+        ))
+    if settings.SERVER_TIMING_SAMPLE_RATE > 0.1:
+        errors.append(checks.Warning(
+            'Server-Timing замеряет больше 10% запросов.',
+            id='blog.W003',
+        ))
+    return errors
+
+
+def ensure_fast_settings():
+    if settings.BLOGICUM_ENV != 'production':
+        return
+    errors = [
+        message for message in checks.run_checks(
+            tags=['performance'], include_deployment_checks=True
+        )
+        if message.is_serious()
+    ]
+    if errors:
+        raise ImproperlyConfigured(
+            'Медленные настройки в профиле production:\n'
+            + '\n'.join(str(error) for error in errors)
+        )
@@ -0,0 +1,160 @@
+"""Условные GET-запросы для страниц постов и лент.
+
+Если клиент прислал `If-None-Match`/`If-Modified-Since`, ETag и
+Last-Modified вычисляются одним запросом к БД до представления, и при
+совпадении ответ 304 уходит без рендера шаблона и без чтения кеша
+страниц. Полностраничный кеш хранит валидаторы вместе со страницей.
+"""
+import asyncio
+from calendar import timegm
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .caches import dependency_versions, posts_removed_at
+from .models import Post
+
+
+def _validators(request, parts, last_modified):
+    if last_modified is None:
+        return None, None
+    # Разметка зависит от вошедшего пользователя, хотя данные те же.
+    etag = '-'.join(map(str, (
+        *parts, f'{last_modified.timestamp():f}', request.user.pk or 0
+    )))
+    return quote_etag(etag), last_modified
+
+
+def post_validators(request, post_id):
+    updated_at = Post.objects.visible_to(request.user).filter(
+        pk=post_id
+    ).values_list('updated_at', flat=True).first()
+    return _validators(request, ('post', post_id), updated_at)
+
+
+def feed_validators(request, **kwargs):
+    """Общие валидаторы лент: главной, категорий и профилей.
+
+    Точный максимум по выборке ленты требует полного просмотра таблицы,
+    поэтому берутся значения по всем постам: любое изменение сбрасывает
+    все ленты сразу, зато запрос читает только индексы. Удаления
+    отмечает версия зависимости `feed`, которую меняет каждое сохранение
+    и удаление поста, а в Last-Modified — время последнего удаления;
+    дата последней публикации учитывает отложенные посты, ставшие
+    видимыми.
+    """
+    freshness = Post.objects.freshness()
+    if freshness['last_updated'] is None:
+        return None, None
+    last_published = freshness['last_published'] or freshness['last_updated']
+    version = dependency_versions(['feed'])['feed']
+    last_modified = max(freshness['last_updated'], last_published)
+    removed_at = posts_removed_at()
+    if removed_at is not None:
+        last_modified = max(last_modified, removed_at)
+    return _validators(
+        request,
+        ('feed', version, f'{last_published.timestamp():f}'),
+        last_modified,
+    )
+
+
+def post_response_validators(request, response):
+    post = response.context_data['post']
+    return _validators(request, ('post', post.pk), post.updated_at)
+
+
+def _is_conditional(request):
+    return (
+        'HTTP_IF_NONE_MATCH' in request.META
+        or 'HTTP_IF_MODIFIED_SINCE' in request.META
+    )
+
+
+def _not_modified(request, etag, last_modified):
+    if etag is None:
+        return None
+    return get_conditional_response(
+        request, etag=etag, last_modified=timegm(last_modified.utctimetuple())
+    )
+
+
+def _needs_validators(response):
+    # Страница из полностраничного кеша уже несёт сохранённые валидаторы.
+    return response.status_code == 200 and not response.has_header('ETag')
+
+
+def _set_validators(response, etag, last_modified):
+    if etag is not None:
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(
+            timegm(last_modified.utctimetuple())
+        )
+    return response
+
+
+def _async_conditional(view, get_validators, get_response_validators):
+    get_validators = sync_to_async(get_validators)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await view(request, *args, **kwargs)
+        validators = None
+        if _is_conditional(request):
+            validators = await get_validators(request, **kwargs)
+            not_modified = _not_modified(request, *validators)
+            if not_modified is not None:
+                return not_modified
+        response = await view(request, *args, **kwargs)
+        if not _needs_validators(response):
+            return response
+        if validators is None and get_response_validators:
+            validators = get_response_validators(request, response)
+        if validators is None:
+            validators = await get_validators(request, **kwargs)
+        return _set_validators(response, *validators)
+    return wrapper
+
+
+def _sync_conditional(view, get_validators, get_response_validators):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        validators = None
+        if _is_conditional(request):
+            validators = get_validators(request, **kwargs)
+            not_modified = _not_modified(request, *validators)
+            if not_modified is not None:
+                return not_modified
+        response = view(request, *args, **kwargs)
+        if not _needs_validators(response):
+            return response
+        if validators is None and get_response_validators:
+            validators = get_response_validators(request, response)
+        if validators is None:
+            validators = get_validators(request, **kwargs)
+        return _set_validators(response, *validators)
+    return wrapper
+
+
+def conditional(get_validators, get_response_validators=None):
+    """Аналог `django.views.decorators.http.condition` с одним запросом.
+
+    `get_validators(request, **kwargs)` возвращает пару (ETag,
+    Last-Modified) или (None, None), если страницы нет. Запрос к БД
+    выполняется, только если клиент прислал валидаторы или ответ
+    собран заново; `get_response_validators(request, response)` берёт
+    их из контекста ответа и избавляет и от этого запроса. Подходит и
+    для асинхронных представлений.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            return _async_conditional(
+                view, get_validators, get_response_validators
+            )
+        return _sync_conditional(view, get_validators, get_response_validators)
+    return decorator
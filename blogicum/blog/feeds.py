@@ -0,0 +1,174 @@
+"""RSS и Atom: общая лента, ленты категорий и авторов.
+
+Отрендеренная лента хранится в кеше вместе с ETag и Last-Modified и
+версиями зависимостей, как страницы в `AnonymousPageCacheMixin`.
+Сигналы меняют версии только при изменении постов и категорий, поэтому
+опрос неизменившейся ленты не обращается к БД, а клиент с валидаторами
+получает 304.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils.text import Truncator
+
+from .caches import (
+    dependency_versions,
+    get_cached_page,
+    get_published_category,
+    page_cache_key,
+    store_page,
+)
+from .mixins import cache_timeout
+from .models import Category, Post, User
+
+FEED_ITEMS = 20
+DESCRIPTION_WORDS = 60
+
+
+class StoredFeed(Feed):
+    """Лента, которая перестраивается только при смене зависимостей."""
+
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума'
+
+    def get_dependencies(self, obj):
+        # Названия категорий и имена авторов выводятся в каждой ленте.
+        return ['feed:categories', 'feed:authors']
+
+    def __call__(self, request, *args, **kwargs):
+        key = page_cache_key(request)
+        response = get_cached_page(key)
+        if response is None:
+            response = self.render(request, key, *args, **kwargs)
+        return get_conditional_response(
+            request,
+            etag=response['ETag'],
+            last_modified=parse_http_date_safe(response['Last-Modified']),
+            response=response,
+        )
+
+    def render(self, request, key, *args, **kwargs):
+        try:
+            obj = self.get_object(request, *args, **kwargs)
+        except ObjectDoesNotExist:
+            raise Http404('Feed object does not exist.')
+        # Версии читаются до выборки постов, как и для страниц.
+        versions = dependency_versions(self.get_dependencies(obj))
+        feed = self.get_feed(obj, request)
+        response = HttpResponse(content_type=feed.content_type)
+        feed.write(response, 'utf-8')
+        response['ETag'] = quote_etag(
+            hashlib.md5(response.content).hexdigest()
+        )
+        response['Last-Modified'] = http_date(
+            feed.latest_post_date().timestamp()
+        )
+        store_page(key, response, versions, cache_timeout(
+            settings.FEED_CACHE_TIMEOUT, until_next_publication=True
+        ))
+        return response
+
+    def items(self, obj=None):
+        return Post.objects.feed()[:FEED_ITEMS]
+
+    def link(self, obj=None):
+        return reverse('blog:index')
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return Truncator(post.text).words(DESCRIPTION_WORDS)
+
+    def item_link(self, post):
+        return reverse('blog:post_detail', kwargs={'post_id': post.pk})
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return max(post.updated_at, post.pub_date)
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_categories(self, post):
+        return (post.category.title, )
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class LatestPostsFeed(StoredFeed):
+    def get_dependencies(self, obj):
+        return ['feed', *super().get_dependencies(obj)]
+
+
+class CategoryPostsFeed(StoredFeed):
+    def get_object(self, request, slug):
+        category = get_published_category(slug)
+        if category is None:
+            raise Category.DoesNotExist
+        return category
+
+    def get_dependencies(self, category):
+        return [
+            f'feed:category:{category.pk}',
+            *super().get_dependencies(category)
+        ]
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', kwargs={'slug': category.slug})
+
+    def items(self, category):
+        return category.post_set.feed()[:FEED_ITEMS]
+
+
+class AuthorPostsFeed(StoredFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_dependencies(self, author):
+        return [f'feed:user:{author.pk}', *super().get_dependencies(author)]
+
+    def title(self, author):
+        return f'Блогикум: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Публикации пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('blog:profile', kwargs={'username': author.username})
+
+    def items(self, author):
+        return author.post_set.feed()[:FEED_ITEMS]
+
+
+class LatestPostsAtomFeed(AtomFeedMixin, LatestPostsFeed):
+    pass
+
+
+class CategoryPostsAtomFeed(AtomFeedMixin, CategoryPostsFeed):
+    pass
+
+
+class AuthorPostsAtomFeed(AtomFeedMixin, AuthorPostsFeed):
+    pass
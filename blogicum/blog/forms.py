@@ -1,12 +1,54 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
+from django.core.exceptions import ValidationError
 
+from .caches import cached_objects
 from .models import Post, Comment
 
 User = get_user_model()
 
 
+class CachedChoiceIterator(forms.models.ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.objects()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.objects())
+
+    def objects(self):
+        return cached_objects(self.queryset).values()
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """Выбор из справочника без запросов к БД.
+
+    Варианты и проверка присланного значения берутся из `cached_objects`.
+    """
+
+    iterator = CachedChoiceIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            value = value.pk
+        try:
+            return cached_objects(self.queryset)[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+
+
 class PostForm(forms.ModelForm):
     pub_date = forms.DateTimeField(
         widget=forms.DateTimeInput(
@@ -22,6 +64,17 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {
+            'category': CachedModelChoiceField,
+            'location': CachedModelChoiceField,
+        }
+
+    def _get_validation_exclusions(self):
+        # Категория и местоположение уже проверены по кешу: модельная
+        # проверка внешних ключей повторила бы запросы к БД.
+        return [
+            *super()._get_validation_exclusions(), 'category', 'location'
+        ]
 
 
 class CommentForm(forms.ModelForm):
@@ -0,0 +1,52 @@
+"""Триггеры синхронизации полнотекстового индекса постов (SQLite FTS5).
+
+Таблицу `blog_post_fts` создаёт миграция 0004. Изменяя поля `Post`,
+SQLite-бэкенд Django пересоздаёт `blog_post`, и триггеры пропадают
+вместе со старой таблицей; после каждой миграции они восстанавливаются,
+а индекс перестраивается.
+"""
+TRIGGERS = {
+    'blog_post_fts_insert': """
+        CREATE TRIGGER blog_post_fts_insert AFTER INSERT ON blog_post BEGIN
+            INSERT INTO blog_post_fts (rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    """,
+    'blog_post_fts_delete': """
+        CREATE TRIGGER blog_post_fts_delete AFTER DELETE ON blog_post BEGIN
+            INSERT INTO blog_post_fts (blog_post_fts, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+        END
+    """,
+    'blog_post_fts_update': """
+        CREATE TRIGGER blog_post_fts_update AFTER UPDATE OF title, text
+        ON blog_post BEGIN
+            INSERT INTO blog_post_fts (blog_post_fts, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+            INSERT INTO blog_post_fts (rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    """,
+}
+
+
+def ensure_search_triggers(connection):
+    """Восстанавливает пропавшие триггеры; True, если понадобилось."""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE name = 'blog_post_fts' OR name LIKE 'blog_post_fts_%'"
+        )
+        existing = {name for kind, name in cursor.fetchall()}
+        if 'blog_post_fts' not in existing or existing >= TRIGGERS.keys():
+            return False
+        for name, sql in TRIGGERS.items():
+            if name not in existing:
+                cursor.execute(sql)
+        # Изменения без триггеров в индекс не попали.
+        cursor.execute(
+            "INSERT INTO blog_post_fts (blog_post_fts) VALUES ('rebuild')"
+        )
+    return True
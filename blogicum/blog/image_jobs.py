@@ -0,0 +1,192 @@
+"""Очередь фоновой обработки загруженных изображений.
+
+Задания хранятся в таблице `ImageJob` и создаются в той же транзакции,
+что и сохранение поста, поэтому обработчик видит их только после
+фиксации. Обработчик (`manage.py process_image_jobs`) забирает задания
+условным UPDATE и отдаёт декодирование и создание копий пулу процессов;
+дочерние процессы с базой не работают.
+"""
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .caches import bump_dependencies
+from .images import delete_derivatives, generate_derivatives
+from .models import ImageJob, Post
+
+logger = logging.getLogger(__name__)
+
+PENDING_DERIVATIVES = {'pending': True}
+# Задание в работе дольше этого считается брошенным упавшим обработчиком.
+STALE_AFTER = timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+
+
+def enqueue(post):
+    """Ставит изображение поста в очередь вместо прежних заданий."""
+    ImageJob.objects.filter(
+        post=post, status=ImageJob.Status.PENDING
+    ).delete()
+    return ImageJob.objects.create(post=post, image=post.image.name)
+
+
+def _claimable():
+    return Q(status=ImageJob.Status.PENDING) | Q(
+        _abandoned(), attempts__lt=MAX_ATTEMPTS
+    )
+
+
+def _abandoned():
+    return Q(
+        status=ImageJob.Status.RUNNING,
+        started_at__lt=timezone.now() - STALE_AFTER,
+    )
+
+
+def fail_abandoned_jobs():
+    """Отказывается от брошенных заданий, исчерпавших попытки.
+
+    Иначе пост навсегда остался бы с заглушкой: карточка снова покажет
+    исходное изображение.
+    """
+    exhausted = Q(_abandoned(), attempts__gte=MAX_ATTEMPTS)
+    for job in ImageJob.objects.filter(exhausted).order_by('id'):
+        if ImageJob.objects.filter(exhausted, pk=job.pk).update(
+            status=ImageJob.Status.FAILED
+        ):
+            finish_job(job, {}, 'Обработчик не завершил задание.')
+
+
+def claim_jobs(limit):
+    """Забирает до `limit` заданий; параллельные обработчики не пересекаются.
+
+    Каждое задание захватывается отдельным UPDATE с повторной проверкой
+    условия: из двух обработчиков строку получит только один.
+    """
+    fail_abandoned_jobs()
+    candidates = ImageJob.objects.filter(_claimable()).order_by(
+        'id'
+    ).values_list('pk', flat=True)[:limit]
+    claimed = [
+        pk for pk in candidates
+        if ImageJob.objects.filter(_claimable(), pk=pk).update(
+            status=ImageJob.Status.RUNNING,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+    ]
+    return list(ImageJob.objects.filter(pk__in=claimed).order_by('id'))
+
+
+def process_image(name):
+    """Выполняется в дочернем процессе."""
+    return generate_derivatives(
+        name, Post._meta.get_field('image').upload_to
+    )
+
+
+def finish_job(job, derivatives, error=''):
+    if not error and not derivatives:
+        error = 'Не удалось прочитать изображение.'
+    # Пока задание выполнялось, изображение могли заменить или удалить.
+    current = Post.objects.filter(pk=job.post_id, image=job.image)
+    post = current.values('category_id', 'image_derivatives').first()
+    if post is None:
+        delete_derivatives(derivatives)
+    else:
+        current.update(
+            image_derivatives=derivatives, updated_at=timezone.now()
+        )
+        # Прежние копии того же файла (повторная обработка).
+        delete_derivatives(post['image_derivatives'])
+        bump_dependencies(
+            'index', f'post:{job.post_id}', f'category:{post["category_id"]}'
+        )
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=ImageJob.Status.FAILED if error else ImageJob.Status.DONE,
+        error=error,
+        finished_at=timezone.now(),
+    )
+
+
+def record_result(job, future):
+    """Записывает итог задания; False, если упал сам процесс пула."""
+    try:
+        derivatives, error = future.result(), ''
+    except BrokenProcessPool:
+        return False
+    except Exception as exception:
+        logger.exception('Ошибка обработки %s', job.image)
+        derivatives, error = {}, repr(exception)
+    finish_job(job, derivatives, error)
+    return True
+
+
+def process_batch(pool, jobs):
+    """Обрабатывает пачку; возвращает задания, оборванные падением пула."""
+    futures = {}
+    try:
+        for job in jobs:
+            futures[pool.submit(process_image, job.image)] = job
+    except BrokenProcessPool:
+        pass
+    crashed = [job for job in jobs if job not in futures.values()]
+    for future in as_completed(futures):
+        if not record_result(futures[future], future):
+            crashed.append(futures[future])
+    return crashed
+
+
+def retry_crashed(jobs):
+    """Повторяет задания упавшего пула по одному, каждое в своём процессе.
+
+    Процесс пула убивает одно задание (например, OOM на огромном файле),
+    а BrokenProcessPool получают все незавершённые. Поодиночке видно
+    виновное: только оно возвращается в очередь с потраченной попыткой.
+    Возвращает число завершённых заданий.
+    """
+    finished = 0
+    for job in jobs:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            if record_result(job, pool.submit(process_image, job.image)):
+                finished += 1
+                continue
+        logger.error('Процесс обработки %s аварийно завершился', job.image)
+        if job.attempts >= MAX_ATTEMPTS:
+            finish_job(job, {}, 'Процесс обработки аварийно завершился.')
+        else:
+            ImageJob.objects.filter(pk=job.pk).update(
+                status=ImageJob.Status.PENDING
+            )
+    return finished
+
+
+def run_worker(workers, batch_size, poll_interval, once=False):
+    """Обрабатывает очередь; с `once` — пока в ней есть задания."""
+    processed = 0
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            # Процесс живёт долго: соединение переоткрывается по тем же
+            # правилам, что и в запросах.
+            close_old_connections()
+            jobs = claim_jobs(batch_size)
+            if not jobs:
+                if once:
+                    return processed
+                time.sleep(poll_interval)
+                continue
+            crashed = process_batch(pool, jobs)
+            processed += len(jobs) - len(crashed)
+            if crashed:
+                pool.shutdown()
+                processed += retry_crashed(crashed)
+                pool = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,106 @@
+"""Уменьшенные копии изображений постов для карточек в лентах.
+
+Для каждой ширины из `POST_IMAGE_WIDTHS` меньше оригинала, а также в
+ширину оригинала, если он уже самой крупной из них, сохраняются WebP и
+JPEG; ориентация из EXIF применяется к пикселям.
+Описание копий хранится в `Post.image_derivatives`:
+
+    {'width': 1600, 'height': 1200,
+     'webp': [[320, 'posts_images/derivatives/...-320.webp'], ...],
+     'jpeg': [[320, 'posts_images/derivatives/...-320.jpg'], ...]}
+
+Пока копии готовятся в фоне, там лежит `{'pending': True}`.
+"""
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {
+        'quality': 82, 'optimize': True, 'progressive': True
+    }),
+}
+# Ширина карточки 40rem за вычетом отступов `.card-body`.
+CARD_SIZES = '(max-width: 40rem) 100vw, 38rem'
+FALLBACK_WIDTH = 640
+
+
+def derivative_widths(width):
+    widths = [w for w in settings.POST_IMAGE_WIDTHS if w < width]
+    # Оригинал уже самой крупной копии сам становится копией: иначе
+    # браузер растягивал бы меньшую. Перекодировка даёт WebP без EXIF.
+    if width < max(settings.POST_IMAGE_WIDTHS):
+        widths.append(width)
+    return widths
+
+
+def generate_derivatives(name, upload_to):
+    """Создаёт копии изображения `name` из хранилища и описывает их.
+
+    К базе данных не обращается, поэтому выполняется и в процессах
+    обработчика очереди (см. `image_jobs`).
+    """
+    try:
+        with default_storage.open(name) as file, Image.open(file) as original:
+            picture = ImageOps.exif_transpose(original)
+            picture.load()
+    except (
+        OSError, UnidentifiedImageError, Image.DecompressionBombError
+    ) as error:
+        logger.warning('Не удалось прочитать %s: %s', name, error)
+        return {}
+    if picture.mode not in ('RGB', 'L'):
+        # JPEG не хранит прозрачность: подкладываем белый фон.
+        background = Image.new('RGB', picture.size, 'white')
+        background.paste(picture.convert('RGBA'), mask=picture.convert(
+            'RGBA'
+        ).getchannel('A'))
+        picture = background
+
+    stem = PurePosixPath(name).stem
+    directory = PurePosixPath(upload_to) / 'derivatives'
+    derivatives = {'width': picture.width, 'height': picture.height}
+    for key in FORMATS:
+        derivatives[key] = []
+    for width in derivative_widths(picture.width):
+        height = max(round(picture.height * width / picture.width), 1)
+        resized = picture.resize((width, height), Image.LANCZOS)
+        for key, (pil_format, extension, options) in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            name = default_storage.save(
+                str(directory / f'{stem}-{width}.{extension}'),
+                ContentFile(buffer.getvalue())
+            )
+            derivatives[key].append([width, name])
+    return derivatives
+
+
+def delete_derivatives(derivatives):
+    for key in FORMATS:
+        for _, name in derivatives.get(key, ()):
+            default_storage.delete(name)
+
+
+def srcset(derivatives, key):
+    return ', '.join(
+        f'{default_storage.url(name)} {width}w'
+        for width, name in derivatives.get(key, ())
+    )
+
+
+def fallback_url(derivatives):
+    """JPEG ближайшей к карточке ширины — для браузеров без srcset."""
+    jpeg = derivatives.get('jpeg')
+    if not jpeg:
+        return None
+    _, name = min(jpeg, key=lambda item: abs(item[0] - FALLBACK_WIDTH))
+    return default_storage.url(name)
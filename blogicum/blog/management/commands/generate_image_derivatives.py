@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from blog.image_jobs import enqueue
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Ставит в очередь обработки изображения постов, загруженные '
+        'до появления уменьшенных копий.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true', dest='regenerate',
+            help='Пересоздать копии и у постов, где они уже есть.'
+        )
+
+    def handle(self, *args, regenerate, **options):
+        posts = Post.objects.filter(image__gt='').order_by('pk').only(
+            'image'
+        )
+        if not regenerate:
+            posts = posts.filter(image_derivatives={})
+        queued = 0
+        # Текущие копии остаются в карточках до готовности новых.
+        for post in posts.iterator():
+            enqueue(post)
+            queued += 1
+        self.stdout.write(
+            f'Поставлено в очередь: {queued}. Обработает их '
+            'process_image_jobs.'
+        )
@@ -0,0 +1,38 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from blog.image_jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает очередь загруженных изображений: проверяет их и '
+        'создаёт уменьшенные копии в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Число процессов обработки.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Сколько заданий забирать за раз (по умолчанию '
+                 'вдвое больше числа процессов).'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза между проверками пустой очереди, с.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда очередь опустеет.'
+        )
+
+    def handle(self, *args, workers, batch_size, poll_interval, once,
+               **options):
+        processed = run_worker(
+            workers, batch_size or workers * 2, poll_interval, once=once
+        )
+        self.stdout.write(f'Обработано заданий: {processed}.')
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает Post.comment_count по таблице комментариев '
+        'и исправляет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов проверять за одну транзакцию.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        fixed = checked = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                stored = dict(
+                    Post.objects.filter(pk__gt=last_id).order_by('pk')
+                    .values_list('pk', 'comment_count')[:batch_size]
+                )
+                if not stored:
+                    break
+                actual = dict(
+                    Comment.objects.filter(post_id__in=stored).order_by()
+                    .values_list('post_id').annotate(total=Count('pk'))
+                )
+                drifted = [
+                    Post(pk=pk, comment_count=actual.get(pk, 0))
+                    for pk, count in stored.items()
+                    if actual.get(pk, 0) != count
+                ]
+                Post.objects.bulk_update(drifted, ['comment_count'])
+            checked += len(stored)
+            fixed += len(drifted)
+            last_id = max(stored)
+        self.stdout.write(
+            f'Проверено постов: {checked}, исправлено: {fixed}.'
+        )
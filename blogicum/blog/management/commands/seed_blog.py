@@ -0,0 +1,270 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.fts import TRIGGERS
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+SEED_PASSWORD = 'blogicum'
+
+POST_COLUMNS = (
+    'id', 'author', 'category', 'location', 'title', 'text', 'pub_date',
+    'is_published', 'comment_count',
+)
+COMMENT_COLUMNS = ('post', 'author', 'text')
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу синтетическими пользователями, категориями, '
+        'местоположениями, постами и комментариями. Строки генерируются '
+        'потоком кортежей и вставляются пачками через executemany.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument(
+            '--comments-per-post', type=float, default=3.0,
+            help='Среднее число комментариев на пост (распределение Парето).'
+        )
+        parser.add_argument(
+            '--author-skew', type=float, default=1.2,
+            help='Параметр Парето для числа постов на автора: чем меньше, '
+                 'тем сильнее перекос в сторону немногих авторов.'
+        )
+        parser.add_argument('--future-fraction', type=float, default=0.02)
+        parser.add_argument('--unpublished-fraction', type=float, default=0.05)
+        parser.add_argument(
+            '--unpublished-categories', type=float, default=0.1
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.connection = connections[DEFAULT_DB_ALIAS]
+        started = time.perf_counter()
+
+        with self.search_index_deferred():
+            first_user = self.insert(
+                User, ('id', 'username', 'password', 'date_joined'),
+                self.generate_users()
+            )
+            first_category = self.insert(
+                Category, ('id', 'title', 'description', 'slug',
+                           'is_published'),
+                self.generate_categories()
+            )
+            first_location = self.insert(
+                Location, ('id', 'name'), self.generate_locations()
+            )
+            total = (
+                options['users'] + options['categories']
+                + options['locations']
+            )
+            posts = self.generate_posts(
+                next_id(Post), first_user, first_category, first_location
+            )
+            # Комментарии идут следом за своей пачкой постов: в памяти
+            # держится не больше одной пачки каждого вида.
+            for batch in batched(posts, options['batch_size']):
+                with transaction.atomic():
+                    self.insert_rows(Post, POST_COLUMNS, batch)
+                    comments = list(self.generate_comments(batch, first_user))
+                    self.insert_rows(Comment, COMMENT_COLUMNS, comments)
+                total += len(batch) + len(comments)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Создано строк: {total} за {elapsed:.1f} с '
+            f'({total / elapsed:.0f} строк/с).'
+        )
+
+    def insert(self, model, columns, generate):
+        first = next_id(model)
+        for batch in batched(generate(first), self.options['batch_size']):
+            with transaction.atomic():
+                self.insert_rows(model, columns, batch)
+        return first
+
+    def insert_rows(self, model, columns, rows):
+        """Вставляет кортежи значений `columns` одним executemany.
+
+        Модели и bulk_create не участвуют: подготовка каждого значения
+        через поля стоила больше самой вставки. Генераторы отдают значения
+        уже в виде для БД, остальные поля получают значения по умолчанию.
+        """
+        if not rows:
+            return
+        fields = [model._meta.get_field(name) for name in columns]
+        defaults = {
+            field: self.default_value(field)
+            for field in model._meta.concrete_fields
+            if field not in fields and not field.primary_key
+        }
+        quote = self.connection.ops.quote_name
+        names = ', '.join(
+            quote(field.column) for field in [*fields, *defaults]
+        )
+        placeholders = ', '.join(['%s'] * (len(fields) + len(defaults)))
+        extra = tuple(defaults.values())
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {quote(model._meta.db_table)} ({names}) '
+                f'VALUES ({placeholders})',
+                [row + extra for row in rows],
+            )
+
+    def default_value(self, field):
+        if getattr(field, 'auto_now', False) or getattr(
+            field, 'auto_now_add', False
+        ):
+            value = self.now
+        else:
+            value = field.get_default()
+        return field.get_db_prep_save(value, self.connection)
+
+    def db_datetime(self, value):
+        return self.connection.ops.adapt_datetimefield_value(value)
+
+    @contextmanager
+    def search_index_deferred(self):
+        """Индексирует новые посты одним запросом вместо триггера на пост."""
+        if self.connection.vendor != 'sqlite':
+            yield
+            return
+        first_post = next_id(Post)
+        with self.connection.cursor() as cursor:
+            for name in TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        try:
+            yield
+        finally:
+            with self.connection.cursor() as cursor:
+                for sql in TRIGGERS.values():
+                    cursor.execute(sql)
+                cursor.execute(
+                    'INSERT INTO blog_post_fts (rowid, title, text) '
+                    'SELECT id, title, text FROM blog_post WHERE id >= %s',
+                    [first_post]
+                )
+
+    def chance(self, fraction):
+        return self.rng.random() < fraction
+
+    def generate_users(self):
+        password = make_password(SEED_PASSWORD)
+        date_joined = self.db_datetime(self.now)
+
+        def generate(first):
+            for pk in range(first, first + self.options['users']):
+                yield pk, f'seed_user_{pk}', password, date_joined
+        return generate
+
+    def generate_categories(self):
+        def generate(first):
+            for pk in range(first, first + self.options['categories']):
+                yield (
+                    pk, f'Категория {pk}', f'Описание категории {pk}',
+                    f'seed-category-{pk}',
+                    not self.chance(self.options['unpublished_categories']),
+                )
+        return generate
+
+    def generate_locations(self):
+        def generate(first):
+            for pk in range(first, first + self.options['locations']):
+                yield pk, f'Место {pk}'
+        return generate
+
+    def generate_posts(
+            self, first_post, first_user, first_category, first_location
+    ):
+        """Кортежи значений POST_COLUMNS."""
+        options = self.options
+        rng = self.rng
+        n_posts = options['posts']
+        n_future = sum(
+            self.chance(options['future_fraction']) for _ in range(n_posts)
+        )
+        # Даты растут вместе с id, как у настоящей ленты: вставка идёт в
+        # конец индексов по pub_date, а не в случайные места B-дерева.
+        n_past = n_posts - n_future
+        past_step = 365 * 24 * 3600 / max(n_past, 1)
+        future_step = 30 * 24 * 3600 / max(n_future, 1)
+        for index, pk in enumerate(range(first_post, first_post + n_posts)):
+            # Индекс по Парето: немногие авторы пишут большую часть постов.
+            author_offset = min(
+                int(rng.paretovariate(options['author_skew'])) - 1,
+                options['users'] - 1,
+            )
+            if index < n_past:
+                pub_date = self.now - timedelta(
+                    seconds=(n_past - index) * past_step
+                )
+            else:
+                pub_date = self.now + timedelta(
+                    seconds=(index - n_past + 1) * future_step
+                )
+            yield (
+                pk,
+                first_user + author_offset,
+                first_category + rng.randrange(options['categories']),
+                (
+                    first_location + rng.randrange(options['locations'])
+                    if options['locations'] and self.chance(0.7) else None
+                ),
+                f'Публикация {pk}',
+                'Текст синтетической публикации. ' * rng.randint(3, 40),
+                self.db_datetime(pub_date),
+                not self.chance(options['unpublished_fraction']),
+                self.comment_count(),
+            )
+
+    def comment_count(self):
+        mean = self.options['comments_per_post']
+        if mean <= 0:
+            return 0
+        # У Парето с alpha = 1.5 среднее 3, у (x - 1) / 2 — единица.
+        return int((self.rng.paretovariate(1.5) - 1) / 2 * mean)
+
+    def generate_comments(self, posts, first_user):
+        """Кортежи значений COMMENT_COLUMNS для пачки постов."""
+        n_users = self.options['users']
+        for post in posts:
+            post_id, comment_count = post[0], post[-1]
+            for _ in range(comment_count):
+                yield (
+                    post_id,
+                    first_user + self.rng.randrange(n_users),
+                    'Синтетический комментарий.',
+                )
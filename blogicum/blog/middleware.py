@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .caches import post_card_stats
+from .routers import RequestRouting, current_routing
+
+logger = logging.getLogger('blog.timing')
+
+# Замер текущего запроса. Контекст копируется в потоки `sync_to_async`,
+# поэтому учитываются и запросы асинхронных представлений из их потоков.
+current_timing = ContextVar('current_timing', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing.record_query(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.view_started = None
+        self.render_started = None
+        self.render = 0.0
+        self.view = 0.0
+        self.cards = dict(post_card_stats)
+        self.lock = threading.Lock()
+
+    def record_query(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            with self.lock:
+                self.sql += elapsed
+                self.queries += 1
+
+    def start_render(self, response):
+        self.render_started = perf_counter()
+        if self.view_started is not None:
+            self.view = self.render_started - self.view_started
+
+    def finish_render(self, response):
+        self.render = perf_counter() - self.render_started
+
+    def finish(self):
+        now = perf_counter()
+        if self.view_started is not None and self.render_started is None:
+            self.view = now - self.view_started
+        self.total = now - self.started
+
+    def metrics(self):
+        return {
+            'db': self.sql,
+            'tpl': self.render,
+            'view': self.view,
+            'total': self.total,
+        }
+
+    def header(self):
+        card_hits = post_card_stats['hits'] - self.cards['hits']
+        card_misses = post_card_stats['misses'] - self.cards['misses']
+        entries = [
+            f'{name};dur={seconds * 1000:.2f}'
+            for name, seconds in self.metrics().items()
+        ]
+        entries[0] += f';desc="{self.queries} queries"'
+        if card_hits or card_misses:
+            entries.append(
+                f'cards;desc="{card_hits} hits, {card_misses} misses"'
+            )
+        return ', '.join(entries)
+
+
+class ServerTimingMiddleware:
+    """Время SQL, рендера шаблонов и представления в `Server-Timing`.
+
+    Замеряется доля запросов `SERVER_TIMING_SAMPLE_RATE`; при
+    `SERVER_TIMING_LOG` метрики дополнительно пишутся в лог `blog.timing`
+    одной JSON-строкой.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Под ASGI цепочка остаётся асинхронной, без перехода в поток.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        timing = self.start(request)
+        if timing is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timing.set(None)
+        return self.finish(request, timing, response)
+
+    async def __acall__(self, request):
+        timing = self.start(request)
+        if timing is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timing.set(None)
+        return self.finish(request, timing, response)
+
+    def start(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return None
+        # Соединения, открытые до подключения приёмника сигнала.
+        for connection in connections.all():
+            install_query_recorder(None, connection)
+        timing = request.timing = RequestTiming()
+        current_timing.set(timing)
+        return timing
+
+    def finish(self, request, timing, response):
+        timing.finish()
+        response['Server-Timing'] = timing.header()
+        if settings.SERVER_TIMING_LOG:
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': timing.queries,
+                **{
+                    f'{name}_ms': round(seconds * 1000, 2)
+                    for name, seconds in timing.metrics().items()
+                },
+            }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = getattr(request, 'timing', None)
+        if timing is not None:
+            timing.view_started = perf_counter()
+
+    def process_template_response(self, request, response):
+        timing = getattr(request, 'timing', None)
+        if timing is not None:
+            timing.start_render(response)
+            response.add_post_render_callback(timing.finish_render)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Чтение страниц `REPLICA_READ_VIEWS` со случайной реплики.
+
+    Любой запрос, кроме GET и HEAD, ставит cookie `REPLICA_PIN_COOKIE`:
+    следующие `REPLICA_PIN_SECONDS` секунд пользователь читает из
+    основной базы и видит свои изменения, даже если реплика отстаёт.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = current_routing.set(RequestRouting())
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        token = current_routing.set(RequestRouting())
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.pin(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Маршрут меняется у общего объекта, а не у самой переменной:
+        # под ASGI этот метод выполняется в скопированном контексте.
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method in ('GET', 'HEAD')
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+            and request.resolver_match.view_name
+            in settings.REPLICA_READ_VIEWS
+        ):
+            current_routing.get().read_database = random.choice(
+                settings.DATABASE_REPLICAS
+            )
+
+    def pin(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
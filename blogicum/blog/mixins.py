@@ -1,10 +1,146 @@
+from functools import partial
+from math import ceil
+
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import Http404
 from django.shortcuts import redirect
+from django.utils import timezone
+
+from .caches import (
+    dependency_versions,
+    get_cached_page,
+    page_cache_key,
+    store_page,
+)
+from .models import Comment, Post
+from .paginators import CursorPaginator, InvalidCursor
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
+    """Доступ только автору; проверка авторства — часть запроса объекта.
+
+    Найденный объект запоминается, и `UpdateView`/`DeleteView` не
+    загружают его повторно.
+    """
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_author_object'):
+            if queryset is None:
+                queryset = self.get_queryset()
+            self._author_object = super().get_object(
+                queryset.filter(author_id=self.request.user.pk)
+            )
+        return self._author_object
+
     def test_func(self):
-        return self.get_object().author == self.request.user
+        try:
+            self.get_object()
+        except Http404:
+            return False
+        return True
 
     def handle_no_permission(self):
+        # Лишний запрос только на неудачном пути: чужой объект ведёт на
+        # страницу поста, несуществующий — на 404.
+        if not self.get_queryset().filter(
+            pk=self.kwargs[self.pk_url_kwarg]
+        ).exists():
+            raise Http404('Object not found')
         return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
+
+
+class CursorPaginationMixin:
+    """Включает keyset-пагинацию по `?after=`/`?before=`.
+
+    Режим включается параметрами запроса или настройкой
+    `BLOG_CURSOR_PAGINATION`; без них работает обычный `Paginator`.
+    """
+
+    cursor_ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        after = self.request.GET.get('after')
+        before = self.request.GET.get('before')
+        if not (after or before or settings.BLOG_CURSOR_PAGINATION):
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(after=after, before=before)
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+def get_comment_page(post_id, after=None):
+    """Порция комментариев поста в порядке добавления после курсора."""
+    return CursorPaginator(
+        Comment.objects.filter(post_id=post_id).select_related('author'),
+        settings.COMMENTS_PER_PAGE, ('created_at', 'id')
+    ).page(after=after)
+
+
+class AnonymousPageCacheMixin:
+    """Кеширует страницу целиком для анонимных GET-запросов.
+
+    Запись в кеше хранит версии объектов, из которых собрана страница;
+    сигналы `blog.signals` меняют версии при сохранении и удалении.
+    """
+
+    # Для лент: запись живёт не дольше, чем до ближайшей отложенной
+    # публикации, чтобы пост появился вовремя.
+    page_cache_until_next_publication = False
+
+    def get_page_dependencies(self):
+        return []
+
+    def get_rendered_page_dependencies(self, context):
+        return []
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request)
+        cached = get_cached_page(key)
+        if cached is not None:
+            return cached
+        # Версии, известные до рендера, читаем до запросов к БД: изменение
+        # во время рендера не даст сохранить устаревшую страницу.
+        versions = dependency_versions(self.get_page_dependencies())
+        response = super().dispatch(request, *args, **kwargs)
+        if (
+            response.status_code == 200
+            and hasattr(response, 'add_post_render_callback')
+        ):
+            response.add_post_render_callback(partial(
+                store_rendered_page, key, versions,
+                self.get_rendered_page_dependencies,
+                self.page_cache_until_next_publication
+            ))
+        return response
+
+
+def cache_timeout(timeout, until_next_publication):
+    """Срок хранения: для лент не дольше ближайшей отложенной публикации."""
+    if until_next_publication:
+        next_publication = Post.objects.next_publication()
+        if next_publication is not None:
+            timeout = min(timeout, ceil(
+                (next_publication - timezone.now()).total_seconds()
+            ))
+    return timeout
+
+
+def store_rendered_page(key, versions, get_dependencies,
+                        until_next_publication, response):
+    """Сохраняет отрендеренную страницу вместе с версиями зависимостей."""
+    timeout = settings.PAGE_CACHE_TIMEOUT
+    if timeout <= 0:
+        return
+    versions.update(dependency_versions(
+        get_dependencies(response.context_data)
+    ))
+    store_page(
+        key, response, versions,
+        cache_timeout(timeout, until_next_publication)
+    )
@@ -89,6 +89,23 @@ class Post(PublishedModel):
         blank=True,
         null=True
     )
+    image_derivatives = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии изображения'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    # Меняется и при изменении того, что выводится вместе с постом:
+    # комментариев, категории, местоположения, имени автора.
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     objects = PostQuerySet.as_manager()
 
@@ -96,6 +113,23 @@ class Post(PublishedModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date', )
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_feed_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx'
+            ),
+            models.Index(fields=('updated_at', ), name='post_updated_idx'),
+        )
 
     def __str__(self):
         return self.title
@@ -121,6 +155,85 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at', )
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
+
+
+class ImageJob(models.Model):
+    """Задание фоновой обработки изображения поста (см. `image_jobs`)."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Обрабатывается'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Пост'
+    )
+    image = models.CharField(max_length=MAX_LENGTH, verbose_name='Файл')
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Состояние'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name='Добавлено')
+    started_at = models.DateTimeField(null=True, blank=True,
+                                      verbose_name='Начато')
+    finished_at = models.DateTimeField(null=True, blank=True,
+                                       verbose_name='Завершено')
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        ordering = ('id', )
+        indexes = (
+            models.Index(
+                fields=('status', 'id'),
+                condition=models.Q(status__in=('pending', 'running')),
+                name='image_job_queue_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.image} ({self.get_status_display()})'
+
+
+class PostSearchIndex(models.Model):
+    """Полнотекстовый индекс FTS5 по заголовку и тексту постов.
+
+    Таблицу и триггеры синхронизации создаёт миграция, только на SQLite.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        db_column='rowid',
+        on_delete=models.DO_NOTHING,
+        related_name='search_index'
+    )
+    # Скрытый столбец FTS5 с именем таблицы: `столбец = запрос` равносилен
+    # MATCH по всем проиндексированным полям.
+    document = models.TextField(db_column='blog_post_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_fts'
@@ -0,0 +1,189 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# Меньшие таблицы дешевле посчитать точно, чем показать оценку.
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация: стоимость страницы не зависит от её глубины.
+
+    `ordering` — поля сортировки в формате `order_by()`, последнее поле
+    должно быть уникальным (обычно `id`), направление у всех полей общее.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.field_names = tuple(name.lstrip('-') for name in self.ordering)
+
+    def encode_cursor(self, obj):
+        values = [
+            self._get_field(name).value_to_string(obj)
+            for name in self.field_names
+        ]
+        payload = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            )
+            values = json.loads(payload)
+        except (binascii.Error, ValueError) as error:
+            raise InvalidCursor(cursor) from error
+        if (
+            not isinstance(values, list)
+            or len(values) != len(self.field_names)
+        ):
+            raise InvalidCursor(cursor)
+        try:
+            return [
+                self._get_field(name).to_python(value)
+                for name, value in zip(self.field_names, values)
+            ]
+        except (TypeError, ValidationError) as error:
+            raise InvalidCursor(cursor) from error
+
+    def page(self, after=None, before=None):
+        if after and before:
+            raise InvalidCursor('Only one of `after`/`before` is allowed.')
+        if before:
+            return self._page_before(self.decode_cursor(before))
+        values = self.decode_cursor(after) if after else None
+        return self._page_after(values)
+
+    def _page_after(self, values):
+        queryset = self.queryset.order_by(*self.ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward=True))
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return CursorPage(
+            rows,
+            next_cursor=(
+                self.encode_cursor(rows[-1]) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0])
+                if values is not None and rows else None
+            ),
+        )
+
+    def _page_before(self, values):
+        queryset = self.queryset.order_by(
+            *(self._reverse(name) for name in self.ordering)
+        ).filter(self._seek(values, forward=False))
+        rows = list(queryset[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return CursorPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1]) if rows else None,
+            previous_cursor=(
+                self.encode_cursor(rows[0]) if has_previous else None
+            ),
+        )
+
+    def _seek(self, values, forward):
+        # (a, b) < (x, y)  <=>  a < x OR (a = x AND b < y)
+        lookup = 'lt' if forward == self.descending else 'gt'
+        condition = Q()
+        for index, name in enumerate(self.field_names):
+            prefix = dict(zip(self.field_names[:index], values[:index]))
+            condition |= Q(**prefix, **{f'{name}__{lookup}': values[index]})
+        return condition
+
+    def _get_field(self, name):
+        return self.queryset.model._meta.get_field(name)
+
+    @staticmethod
+    def _reverse(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+
+def estimated_count(model, using):
+    """Число строк таблицы по статистике БД или None, если её нет.
+
+    Для SQLite статистику собирает `ANALYZE` (`sqlite_stat1`), для
+    PostgreSQL — autovacuum (`pg_class.reltuples`).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'sqlite':
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return None
+    # В `sqlite_stat1` первое число каждой строки — размер таблицы.
+    counts = [int(str(stat).split()[0]) for stat, in rows]
+    return max(counts) if counts and max(counts) >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Для нефильтрованного списка большой таблицы берёт оценку числа строк.
+
+    Точный `COUNT(*)` по миллионам строк читает всю таблицу; страницам
+    админки достаточно оценки. Отфильтрованные списки считаются точно.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
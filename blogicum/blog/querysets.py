@@ -1,6 +1,20 @@
-from django.db.models import Count, QuerySet
+import re
+
+from django.db import connections
+from django.db.models import DateTimeField, Func, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+SEARCH_TERMS_LIMIT = 10
+# Ранжируются только самые новые видимые совпадения: bm25 считается для
+# каждой найденной строки, и слово из каждого поста иначе стоило бы секунд.
+SEARCH_CANDIDATES_LIMIT = 1000
+
+
+def search_terms(query):
+    """Слова поискового запроса без знаков препинания и операторов."""
+    return re.findall(r'\w+', query.lower())[:SEARCH_TERMS_LIMIT]
+
 
 class PostQuerySet(QuerySet):
     def published(self):
@@ -8,14 +22,71 @@ class PostQuerySet(QuerySet):
             pub_date__lte=timezone.now(),
             is_published=True,
             category__is_published=True
-        ).order_by('-pub_date')
+        ).order_by('-pub_date', '-id')
+
+    def visible_to(self, user):
+        visible = Q(
+            pub_date__lte=timezone.now(),
+            is_published=True,
+            category__is_published=True
+        )
+        if user.is_authenticated:
+            visible |= Q(author=user)
+        return self.filter(visible).with_related()
 
     def with_related(self):
         return self.select_related(
             'category', 'location', 'author'
         )
 
-    def annotate_comments(self):
-        return self.annotate(
-            comment_count=Count('comments')
+    def feed(self, only_published=True):
+        queryset = self.published() if only_published else self.order_by(
+            '-pub_date', '-id'
         )
+        return queryset.with_related()
+
+    def search(self, query):
+        terms = search_terms(query)
+        if not terms:
+            return self.none()
+        if connections[self.db].vendor == 'sqlite':
+            # Каждое слово — префикс в кавычках, поэтому синтаксис FTS5
+            # из пользовательского ввода не интерпретируется.
+            match = ' '.join(f'"{term}"*' for term in terms)
+            matches = self.filter(search_index__document=match)
+            # Кандидаты отбираются уже с фильтром видимости из self:
+            # иначе новые скрытые посты вытеснили бы видимые. Граница по
+            # rowid, а не IN, — чтобы и внешний запрос читал из индекса
+            # FTS5 только кандидатов.
+            oldest_candidate = Coalesce(Subquery(
+                matches.order_by('-search_index__post_id').values(
+                    'search_index__post_id'
+                )[SEARCH_CANDIDATES_LIMIT - 1:SEARCH_CANDIDATES_LIMIT]
+            ), 0)
+            return matches.filter(
+                search_index__post__gte=oldest_candidate
+            ).order_by('search_index__rank', '-pub_date', '-id')
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(text__icontains=term)
+        return self.filter(condition).order_by('-pub_date', '-id')
+
+    def freshness(self):
+        """Последнее изменение и последняя публикация.
+
+        Одна строка, и оба значения — поиск по индексу, без просмотра
+        таблицы: подходит для валидаторов условных GET-запросов к лентам.
+        Удаления здесь не видны, их учитывает вызывающий код.
+        """
+        posts = self.order_by()
+        return posts.values(last_updated=Func(
+            'updated_at', function='MAX', output_field=DateTimeField()
+        )).annotate(last_published=Subquery(posts.filter(
+            is_published=True, pub_date__lte=timezone.now()
+        ).order_by('-pub_date').values('pub_date')[:1])).get()
+
+    def next_publication(self):
+        return self.filter(
+            is_published=True,
+            pub_date__gt=timezone.now()
+        ).order_by('pub_date').values_list('pub_date', flat=True).first()
@@ -0,0 +1,46 @@
+"""Маршрутизация чтения на реплики.
+
+`ReplicaRoutingMiddleware` выбирает для запроса базу чтения и кладёт её
+в `current_routing`; роутер отдаёт её Django. Записи всегда идут в
+`default`. Контекст копируется в потоки `sync_to_async`, поэтому
+асинхронные представления читают с той же реплики.
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+current_routing = ContextVar('current_routing', default=None)
+
+
+class RequestRouting:
+    def __init__(self):
+        self.read_database = None
+
+
+def reading_from_replica():
+    """Читает ли текущий запрос с реплики."""
+    routing = current_routing.get()
+    return routing is not None and routing.read_database is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = current_routing.get()
+        return routing.read_database if routing is not None else None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы: связи между ними допустимы.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема приходит на реплики вместе с репликацией.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
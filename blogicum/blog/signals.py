@@ -0,0 +1,210 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caches import (
+    bump_dependencies,
+    mark_posts_removed,
+    post_dependencies,
+)
+from .image_jobs import PENDING_DERIVATIVES, enqueue
+from .images import delete_derivatives
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+# Поля, которые выводятся вместе с постами: только их правка меняет
+# страницы, ленты и updated_at постов.
+DISPLAYED_FIELDS = {
+    Category: ('title', 'slug', 'is_published'),
+    Location: ('name', 'is_published'),
+    User: ('username', ),
+}
+
+# Посты, которые удаляются прямо сейчас. Их комментарии уходят каскадом,
+# и пересчитывать счётчик и сбрасывать страницы для каждого незачем:
+# invalidate_post_pages сделает это один раз.
+_deleting_posts = set()
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw=False, **kwargs):
+    # Комментарии — часть страницы поста: правка тоже обновляет updated_at.
+    if raw:
+        return
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    if instance.post_id in _deleting_posts:
+        return
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0),
+        updated_at=timezone.now()
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleting_post(sender, instance, **kwargs):
+    _deleting_posts.add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleting_post(sender, instance, **kwargs):
+    _deleting_posts.discard(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post(sender, instance, raw=False, **kwargs):
+    # Пост могли перенести в другую категорию: сбросить нужно обе.
+    # Сменившемуся изображению нужны новые уменьшенные копии.
+    instance._previous_category_id = None
+    instance._previous_image = ''
+    if instance.pk and not raw:
+        instance._previous_category_id, instance._previous_image = (
+            Post.objects.filter(pk=instance.pk).values_list(
+                'category_id', 'image'
+            ).first() or (None, '')
+        )
+
+
+@receiver(pre_save, sender=Post)
+def fill_missing_updated_at(sender, instance, raw=False, **kwargs):
+    # loaddata сохраняет с raw=True, и auto_now не срабатывает: в
+    # фикстурах, выгруженных до появления столбца, его значения нет.
+    if raw and instance.updated_at is None:
+        instance.updated_at = timezone.now()
+
+
+@receiver(post_save, sender=Post)
+def enqueue_image_processing(sender, instance, raw=False, **kwargs):
+    # Декодирование и копии делает process_image_jobs после фиксации
+    # транзакции; до тех пор карточка показывает заглушку.
+    image = instance.image.name or ''
+    if raw or image == (getattr(instance, '_previous_image', '') or ''):
+        return
+    # При откате строка по-прежнему ссылается на прежние копии.
+    transaction.on_commit(
+        partial(delete_derivatives, instance.image_derivatives)
+    )
+    instance.image_derivatives = dict(PENDING_DERIVATIVES) if image else {}
+    Post.objects.filter(pk=instance.pk).update(
+        image_derivatives=instance.image_derivatives
+    )
+    if image:
+        enqueue(instance)
+
+
+@receiver(post_delete, sender=Post)
+def delete_image_derivatives(sender, instance, **kwargs):
+    transaction.on_commit(
+        partial(delete_derivatives, instance.image_derivatives)
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, signal, **kwargs):
+    # Комментарии в RSS/Atom не выводятся, поэтому ленты меняются только
+    # здесь и при правке категорий и авторов.
+    dependencies = post_dependencies(
+        instance.pk, instance.category_id, instance.author_id
+    )
+    previous_category_id = getattr(instance, '_previous_category_id', None)
+    if previous_category_id:
+        dependencies.add(f'category:{previous_category_id}')
+        dependencies.add(f'feed:category:{previous_category_id}')
+    if signal is post_delete:
+        mark_posts_removed()
+    bump_dependencies(*dependencies)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    if instance.post_id in _deleting_posts:
+        return
+    category_id = Post.objects.filter(
+        pk=instance.post_id
+    ).values_list('category_id', flat=True).first()
+    bump_dependencies(
+        'index', f'post:{instance.post_id}', f'category:{category_id}'
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    bump_dependencies(
+        'index', f'category:{instance.pk}', 'feed:categories',
+        'choices:category'
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    bump_dependencies(f'location:{instance.pk}', 'choices:location')
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Location)
+@receiver(pre_save, sender=User)
+def remember_displayed_changes(sender, instance, raw=False,
+                               update_fields=None, **kwargs):
+    # form.save() сохраняет все поля, даже не изменившиеся, поэтому
+    # значения сравниваются с сохранёнными в базе.
+    instance._displayed_changed = False
+    fields = [
+        field for field in DISPLAYED_FIELDS[sender]
+        if update_fields is None or field in update_fields
+    ]
+    if raw or instance.pk is None or not fields:
+        return
+    previous = sender._default_manager.filter(pk=instance.pk).values(
+        *fields
+    ).first()
+    instance._displayed_changed = previous is not None and any(
+        previous[field] != getattr(instance, field) for field in fields
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_pages(sender, instance, signal, **kwargs):
+    # Регистрация и правка профиля не меняют ни одной страницы с постами.
+    if signal is post_save and not instance._displayed_changed:
+        return
+    bump_dependencies(f'user:{instance.pk}', 'feed:authors')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=User)
+def touch_related_posts(sender, instance, **kwargs):
+    # Название категории, места и имя автора выводятся вместе с постом,
+    # поэтому их правка обновляет валидаторы условных GET-запросов.
+    if not instance._displayed_changed:
+        return
+    if sender is User:
+        related = Q(author=instance) | Q(comments__author=instance)
+    else:
+        related = Q(**{sender._meta.model_name: instance})
+    Post.objects.filter(
+        pk__in=Post.objects.filter(related).values('pk')
+    ).update(updated_at=timezone.now())
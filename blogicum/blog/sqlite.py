@@ -0,0 +1,11 @@
+"""Прагмы соединений SQLite из настройки `SQLITE_PRAGMAS`."""
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    # Напрямую через DB-API: прагмы не проходят через обёртки запросов и
+    # не попадают в счётчики Server-Timing и тестов.
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
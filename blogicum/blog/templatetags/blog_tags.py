@@ -0,0 +1,31 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog import images
+from blog.caches import render_post_card
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    return mark_safe(render_post_card(post))
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(post):
+    """Изображение карточки: уменьшенные копии через srcset, если есть.
+
+    Пока копии готовятся в очереди, выводится заглушка.
+    """
+    derivatives = post.image_derivatives
+    return {
+        'post': post,
+        'pending': derivatives.get('pending', False),
+        'webp_srcset': images.srcset(derivatives, 'webp'),
+        'jpeg_srcset': images.srcset(derivatives, 'jpeg'),
+        'src': images.fallback_url(derivatives) or post.image.url,
+        'sizes': images.CARD_SIZES,
+        'width': derivatives.get('width'),
+        'height': derivatives.get('height'),
+    }
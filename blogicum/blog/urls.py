@@ -1,22 +1,51 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, feeds, views
 
 app_name = 'blog'
 
+if settings.BLOG_ASYNC_VIEWS:
+    read_views = {
+        'index': async_views.index,
+        'post_detail': async_views.post_detail,
+        'category_posts': async_views.category_posts,
+        'profile': async_views.profile,
+    }
+else:
+    read_views = {
+        'index': views.IndexListView.as_view(),
+        'post_detail': views.PostDetailView.as_view(),
+        'category_posts': views.CategoryListView.as_view(),
+        'profile': views.ProfileListView.as_view(),
+    }
+
 urlpatterns = [
-    path('', views.IndexListView.as_view(), name='index'),
-    path('posts/<int:post_id>/', views.PostDetailView.as_view(),
+    path('', read_views['index'], name='index'),
+    path('posts/<int:post_id>/', read_views['post_detail'],
          name='post_detail'),
-    path('category/<slug:slug>/', views.CategoryListView.as_view(),
+    path('category/<slug:slug>/', read_views['category_posts'],
          name='category_posts'),
-    path('profile/<str:username>/', views.ProfileListView.as_view(),
+    path('profile/<str:username>/', read_views['profile'],
          name='profile'),
+    path('search/', views.SearchListView.as_view(), name='search'),
+    path('rss/', feeds.LatestPostsFeed(), name='feed_rss'),
+    path('atom/', feeds.LatestPostsAtomFeed(), name='feed_atom'),
+    path('category/<slug:slug>/rss/', feeds.CategoryPostsFeed(),
+         name='category_feed_rss'),
+    path('category/<slug:slug>/atom/', feeds.CategoryPostsAtomFeed(),
+         name='category_feed_atom'),
+    path('profile/<str:username>/rss/', feeds.AuthorPostsFeed(),
+         name='profile_feed_rss'),
+    path('profile/<str:username>/atom/', feeds.AuthorPostsAtomFeed(),
+         name='profile_feed_atom'),
     path('posts/create/', views.PostCreateView.as_view(), name='create_post'),
     path('posts/<int:post_id>/edit/', views.PostUpdateView.as_view(),
          name='edit_post'),
     path('posts/<int:post_id>/delete/', views.PostDeleteView.as_view(),
          name='delete_post'),
+    path('posts/<int:post_id>/comments/', views.PostCommentsView.as_view(),
+         name='post_comments'),
     path('posts/<int:post_id>/comment/', views.CommentCreateView.as_view(),
          name='add_comment'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
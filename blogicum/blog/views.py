@@ -3,7 +3,8 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -12,42 +13,71 @@ from django.views.generic import (
     UpdateView,
 )
 
+from .caches import card_dependencies, get_published_category
+from .conditional import (
+    conditional,
+    feed_validators,
+    post_response_validators,
+    post_validators,
+)
 from .forms import CommentForm, PostForm, ProfileEditForm, SignUpForm
-from .mixins import OnlyAuthorMixin
-from .models import Category, Comment, Post, User
+from .mixins import (
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    OnlyAuthorMixin,
+    get_comment_page,
+)
+from .paginators import InvalidCursor
+from .models import Comment, Post, User
 
 
-class IndexListView(ListView):
+@method_decorator(conditional(feed_validators), name='dispatch')
+class IndexListView(AnonymousPageCacheMixin, CursorPaginationMixin,
+                    ListView):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = 10
-    queryset = Post.objects.published().annotate_comments()
+    queryset = Post.objects.feed()
+    page_cache_until_next_publication = True
+
+    def get_page_dependencies(self):
+        return ['index']
 
+    def get_rendered_page_dependencies(self, context):
+        return [
+            dependency for post in context['page_obj']
+            for dependency in card_dependencies(post)
+        ]
 
-class CategoryListView(ListView):
+
+@method_decorator(conditional(feed_validators), name='dispatch')
+class CategoryListView(AnonymousPageCacheMixin, CursorPaginationMixin,
+                       ListView):
     model = Post
     template_name = 'blog/category.html'
     paginate_by = 10
+    page_cache_until_next_publication = True
 
     def get_queryset(self):
-        category = get_object_or_404(
-            Category,
-            slug=self.kwargs['slug'],
-            is_published=True
-        )
-        return category.post_set.published().annotate_comments()
+        self.category = get_published_category(self.kwargs['slug'])
+        if self.category is None:
+            raise Http404('Category not found')
+        return self.category.post_set.feed()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category,
-            slug=self.kwargs['slug'],
-            is_published=True
-        )
+        context['category'] = self.category
         return context
 
+    def get_rendered_page_dependencies(self, context):
+        return [f'category:{context["category"].pk}'] + [
+            dependency for post in context['page_obj']
+            for dependency in card_dependencies(post)
+        ]
 
-class ProfileListView(ListView):
+
+@method_decorator(conditional(feed_validators), name='dispatch')
+class ProfileListView(CursorPaginationMixin, ListView):
     model = Post
     template_name = 'blog/profile.html'
     paginate_by = 10
@@ -57,12 +87,8 @@ class ProfileListView(ListView):
             User, username=self.kwargs['username']
         )
         if self.request.user == self.profile_user:
-            return (
-                self.profile_user.post_set.with_related()
-                .annotate_comments()
-                .order_by('-pub_date')
-            )
-        return self.profile_user.post_set.published().annotate_comments()
+            return self.profile_user.post_set.feed(only_published=False)
+        return self.profile_user.post_set.feed()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -70,6 +96,33 @@ class ProfileListView(ListView):
         return context
 
 
+class SearchListView(AnonymousPageCacheMixin, ListView):
+    model = Post
+    template_name = 'blog/search.html'
+    paginate_by = 10
+    page_cache_until_next_publication = True
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return Post.objects.visible_to(self.request.user).search(self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        # Префикс ссылок пагинатора, чтобы не терять запрос.
+        context['pagination_query'] = urlencode({'q': self.query}) + '&'
+        return context
+
+    def get_page_dependencies(self):
+        return ['index']
+
+    def get_rendered_page_dependencies(self, context):
+        return [
+            dependency for post in context['page_obj']
+            for dependency in card_dependencies(post)
+        ]
+
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
     form_class = ProfileEditForm
@@ -87,27 +140,68 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
                        kwargs={'username': self.object.username})
 
 
-class PostDetailView(DetailView):
+@method_decorator(
+    conditional(post_validators, post_response_validators), name='dispatch'
+)
+class PostDetailView(AnonymousPageCacheMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
 
     def get_object(self):
-        post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        if post.author != self.request.user:
-            post = get_object_or_404(
-                Post.objects.published(),
-                pk=self.kwargs['post_id']
-            )
-        return post
+        return get_object_or_404(
+            Post.objects.visible_to(self.request.user),
+            pk=self.kwargs['post_id']
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related(
-            'author'
-        ).order_by('created_at')
+        context['comments'] = get_comment_page(self.object.pk)
         return context
 
+    def get_page_dependencies(self):
+        return [f'post:{self.kwargs["post_id"]}']
+
+    def get_rendered_page_dependencies(self, context):
+        post = context['post']
+        return [f'category:{post.category_id}', *card_dependencies(post)] + [
+            f'user:{comment.author_id}' for comment in context['comments']
+        ]
+
+
+@method_decorator(
+    conditional(post_validators, post_response_validators), name='dispatch'
+)
+class PostCommentsView(AnonymousPageCacheMixin, DetailView):
+    """Фрагмент со следующей порцией комментариев к посту."""
+
+    model = Post
+    template_name = 'includes/comments.html'
+
+    def get_object(self):
+        return get_object_or_404(
+            Post.objects.visible_to(self.request.user),
+            pk=self.kwargs['post_id']
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            context['comments'] = get_comment_page(
+                self.object.pk, after=self.request.GET.get('after')
+            )
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return context
+
+    def get_page_dependencies(self):
+        return [f'post:{self.kwargs["post_id"]}']
+
+    def get_rendered_page_dependencies(self, context):
+        return [
+            f'user:{comment.author_id}' for comment in context['comments']
+        ]
+
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
@@ -130,6 +224,9 @@ class PostUpdateView(OnlyAuthorMixin, UpdateView):
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
+    def get_queryset(self):
+        return Post.objects.visible_to(self.request.user)
+
     def get_success_url(self):
         return reverse('blog:post_detail',
                        kwargs={'post_id': self.kwargs['post_id']})
@@ -140,6 +237,9 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
+    def get_queryset(self):
+        return Post.objects.visible_to(self.request.user)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = PostForm(instance=self.object)
@@ -154,21 +254,19 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     model = Comment
     form_class = CommentForm
 
+    def get_post(self):
+        return get_object_or_404(
+            Post.objects.visible_to(self.request.user),
+            pk=self.kwargs['post_id']
+        )
+
     def get(self, request, *args, **kwargs):
-        get_object_or_404(Post, pk=self.kwargs['post_id'])
+        self.get_post()
         return super().get(request, *args, **kwargs)
 
     def form_valid(self, form):
-        post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        if (
-            not post.is_published
-            or post.pub_date > timezone.now()
-            or not post.category.is_published
-        ):
-            if post.author != self.request.user:
-                raise Http404('Post not found')
         form.instance.author = self.request.user
-        form.instance.post = post
+        form.instance.post = self.get_post()
         self.object = form.save()
         return super().form_valid(form)
 
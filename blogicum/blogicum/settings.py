@@ -1,8 +1,14 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Профиль настроек: development (по умолчанию) или production. Значения
+# ниже — общие; в конце файла профиль production переопределяет их, а
+# отдельные переменные окружения — профиль.
+BLOGICUM_ENV = os.environ.get('BLOGICUM_ENV', 'development')
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -31,6 +37,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.ServerTimingMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,9 +78,55 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+    },
+}
+
+# Реплики, с которых читают страницы `REPLICA_READ_VIEWS`: пути к копиям
+# файла основной базы через запятую (например, обновляемым Litestream).
+# Без переменной алиасов реплик нет и всё читается из `default`.
+DATABASE_REPLICAS = ()
+for number, replica in enumerate(filter(None, os.environ.get(
+    'BLOGICUM_DB_REPLICAS', ''
+).split(',')), start=1):
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': replica,
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS += (f'replica_{number}', )
+
+# Прагмы, которые выполняются для каждого нового соединения SQLite. В
+# разработке и тестах SQLite работает с настройками по умолчанию,
+# профиль production включает PRODUCTION_SQLITE_PRAGMAS.
+SQLITE_PRAGMAS = {}
+
+# В режиме WAL чтение не ждёт записи, а synchronous=NORMAL в нём не
+# теряет целостности. cache_size в КиБ (отрицательное значение) — у
+# каждого соединения свой, а их в процессе до BLOG_ASYNC_QUERY_THREADS,
+# поэтому он невелик; общий для соединений кеш даёт mmap_size (байты).
+# busy_timeout в мс.
+PRODUCTION_SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -8 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'memory',
 }
 
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+REPLICA_READ_VIEWS = (
+    'blog:index', 'blog:category_posts', 'blog:profile', 'blog:post_detail',
+    'pages:about', 'pages:rules',
+)
+
+# После записи пользователь столько секунд читает из основной базы.
+REPLICA_PIN_SECONDS = 10
+REPLICA_PIN_COOKIE = 'read_primary'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -130,3 +184,94 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'blog:index'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Ширины уменьшенных копий изображений постов для srcset карточек, px.
+POST_IMAGE_WIDTHS = (320, 640, 960, 1280)
+
+# Keyset-пагинация лент (`?after=`/`?before=`) вместо `?page=N`.
+BLOG_CURSOR_PAGINATION = False
+
+# Комментарии под постом: первая порция на странице, остальные
+# подгружаются фрагментами по курсору.
+COMMENTS_PER_PAGE = 50
+
+# Асинхронные представления ленты, категорий, профиля и поста (для ASGI).
+BLOG_ASYNC_VIEWS = False
+# Потоки для параллельных SQL-запросов асинхронных представлений.
+BLOG_ASYNC_QUERY_THREADS = 16
+
+# Время жизни отрендеренных карточек постов в кеше, секунды.
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Время жизни страниц ленты, категорий и постов для анонимных читателей.
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Время жизни RSS/Atom: ленты перестраиваются сигналами при изменении
+# постов и категорий, срок лишь ограничивает память кеша.
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Доля запросов, для которых отдаётся заголовок Server-Timing (0..1),
+# и запись тех же метрик в лог `blog.timing`.
+SERVER_TIMING_SAMPLE_RATE = 1.0
+SERVER_TIMING_LOG = False
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'BLOGICUM_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('BLOGICUM_CACHE_LOCATION', ''),
+    }
+}
+
+SESSION_ENGINE = os.environ.get(
+    'BLOGICUM_SESSION_ENGINE', 'django.contrib.sessions.backends.db'
+)
+
+if BLOGICUM_ENV == 'production':
+    DEBUG = False
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+    ALLOWED_HOSTS = os.environ['DJANGO_ALLOWED_HOSTS'].split(',')
+
+    # Шаблоны компилируются один раз на процесс.
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [(
+        'django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]
+    )]
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+        'django.template.context_processors.debug'
+    )
+
+    # Версии зависимостей страниц должны быть общими для всех процессов.
+    CACHES['default'].update(
+        BACKEND=os.environ.get(
+            'BLOGICUM_CACHE_BACKEND',
+            'django.core.cache.backends.memcached.PyMemcacheCache'
+        ),
+        LOCATION=os.environ.get('BLOGICUM_CACHE_LOCATION', '127.0.0.1:11211'),
+    )
+    SESSION_ENGINE = os.environ.get(
+        'BLOGICUM_SESSION_ENGINE',
+        'django.contrib.sessions.backends.cached_db'
+    )
+
+    STATIC_ROOT = os.environ.get(
+        'BLOGICUM_STATIC_ROOT', str(BASE_DIR / 'staticfiles')
+    )
+    STATICFILES_STORAGE = (
+        'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+    )
+
+    SQLITE_PRAGMAS = PRODUCTION_SQLITE_PRAGMAS
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = int(
+            os.environ.get('BLOGICUM_CONN_MAX_AGE', 600)
+        )
+
+    SERVER_TIMING_SAMPLE_RATE = float(
+        os.environ.get('SERVER_TIMING_SAMPLE_RATE', 0.01)
+    )
@@ -0,0 +1,21 @@
+// Ссылка «Показать ещё комментарии» заменяется следующей порцией.
+document.addEventListener('click', function (event) {
+  const link = event.target.closest('[data-load-comments]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.href)
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      link.outerHTML = html;
+    })
+    .catch(function () {
+      window.location.href = link.href;
+    });
+});
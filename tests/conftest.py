@@ -3,6 +3,7 @@ import re
 import time
 from http import HTTPStatus
 from inspect import getsource
+from io import BytesIO, StringIO
 from pathlib import Path
 from typing import (
     Iterable,
@@ -18,13 +19,18 @@ from typing import (
 
 import pytest
 from django.apps import apps
+from django.conf import settings as django_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
 from django.test import override_settings
 from django.test.client import Client
 from mixer.backend.django import mixer as _mixer
+from PIL import Image
 
 N_PER_FIXTURE = 3
 N_PER_PAGE = 10
@@ -33,6 +39,33 @@ COMMENT_TEXT_DISPLAY_LEN_FOR_TESTS = 50
 KeyVal = NamedTuple("KeyVal", [("key", Optional[str]), ("val", Optional[str])])
 UrlRepr = NamedTuple("UrlRepr", [("url", str), ("repr", str)])
 TitledUrlRepr = TypeVar("TitledUrlRepr", bound=Tuple[UrlRepr, str])
+EXIF_ORIENTATION = 0x0112
+
+
+def make_image(size, name="photo.jpg", orientation=None, mode="RGB"):
+    buffer = BytesIO()
+    picture = Image.new(mode, size, color=(200, 30, 30, 128)[:len(mode)])
+    exif = Image.Exif()
+    if orientation:
+        exif[EXIF_ORIENTATION] = orientation
+    picture.save(
+        buffer, "PNG" if mode == "RGBA" else "JPEG", exif=exif.tobytes()
+    )
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+def process_image_jobs():
+    call_command(
+        "process_image_jobs", "--once", "--workers", "1", stdout=StringIO()
+    )
+
+
+# Реплика для тестов маршрутизации — зеркало тестовой базы `default`. В
+# настройках проекта алиасы реплик появляются, только если они заданы
+# окружением.
+django_settings.DATABASES.setdefault('replica', {
+    **django_settings.DATABASES['default'], 'TEST': {'MIRROR': 'default'},
+})
 
 
 @pytest.fixture(autouse=True)
@@ -41,6 +74,14 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Кеш живёт дольше транзакции теста: не даём страницам одного теста
+    # попасть в другой.
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +404,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -21,6 +21,25 @@ from conftest import (
 )
 
 
+@pytest.fixture
+def media_root(settings, tmp_path):
+    # Загрузки и их копии — во временном каталоге теста.
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_WIDTHS = (320, 640, 960)
+    return tmp_path
+
+
+@pytest.fixture
+def published_post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
 @pytest.fixture
 def posts_with_unpublished_category(mixer: Mixer, user: Model):
     return mixer.cycle(N_PER_FIXTURE).blend(
@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import paginators
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+CHANGELIST_URL = '/admin/blog/post/'
+
+
+@pytest.fixture
+def make_posts(mixer, user, published_category, published_location):
+    def make(number, **kwargs):
+        return mixer.cycle(number).blend(
+            'blog.Post', author=user, category=published_category,
+            location=published_location, pub_date=timezone.now(), **kwargs
+        )
+    return make
+
+
+def _get(client, url, data=None):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, data)
+    assert response.status_code == HTTPStatus.OK
+    return response, [query['sql'] for query in ctx.captured_queries]
+
+
+def test_changelist_queries_do_not_grow(admin_client, make_posts):
+    make_posts(3)
+    _, few = _get(admin_client, CHANGELIST_URL)
+    make_posts(30)
+    _, many = _get(admin_client, CHANGELIST_URL)
+    assert len(many) == len(few), (
+        "Убедитесь, что список публикаций в админке загружает авторов,"
+        " категории и местоположения вместе с постами."
+    )
+
+
+def test_changelist_uses_estimated_count(
+        admin_client, make_posts, monkeypatch
+):
+    make_posts(5)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    assert paginators.estimated_count(Post, 'default') == 5
+    monkeypatch.setattr(paginators, 'ESTIMATED_COUNT_THRESHOLD', 1)
+
+    response, queries = _get(admin_client, CHANGELIST_URL)
+    assert not [sql for sql in queries if 'COUNT(' in sql], (
+        "Убедитесь, что нефильтрованный список публикаций не выполняет"
+        " COUNT(*), а берёт оценку числа строк из статистики БД."
+    )
+    assert response.context['cl'].result_count == 5
+
+    _, queries = _get(
+        admin_client, CHANGELIST_URL, {'is_published__exact': 1}
+    )
+    assert [sql for sql in queries if 'COUNT(' in sql], (
+        "Убедитесь, что отфильтрованный список считается точно."
+    )
+
+
+def test_change_form_has_no_full_selects(admin_client, make_posts, user):
+    post, = make_posts(1)
+    content = admin_client.get(
+        f'{CHANGELIST_URL}{post.pk}/change/'
+    ).content.decode()
+    assert 'vForeignKeyRawIdAdminField' in content, (
+        "Убедитесь, что автор выбирается через raw_id_fields."
+    )
+    assert 'admin-autocomplete' in content, (
+        "Убедитесь, что категория и местоположение выбираются через"
+        " autocomplete_fields."
+    )
+    assert f'<option value="{user.pk}">' not in content
+
+
+def test_search_by_author_and_text(admin_client, make_posts, another_user):
+    post, other = make_posts(2, title='Обычный заголовок')
+    other.title = 'Заметка про маяки'
+    other.author = another_user
+    other.save()
+    response, _ = _get(admin_client, CHANGELIST_URL, {'q': 'маяки'})
+    assert list(response.context['cl'].result_list) == [other]
+    response, _ = _get(
+        admin_client, CHANGELIST_URL, {'q': another_user.username}
+    )
+    assert list(response.context['cl'].result_list) == [other], (
+        "Убедитесь, что публикации ищутся по логину автора и по тексту."
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN есть в SQLite'
+)
+@pytest.mark.parametrize('model', (Post, Comment))
+def test_author_search_uses_indexes(model, user):
+    queryset, _ = site._registry[model].get_search_results(
+        None, model.objects.order_by('-id'), user.username
+    )
+    sql, params = queryset[:100].query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        steps = [row[-1] for row in cursor.fetchall()]
+    assert not [
+        step for step in steps
+        if step.startswith('SCAN') and 'VIRTUAL TABLE' not in step
+    ], f"Убедитесь, что поиск в админке идёт по индексам: {steps}"
+
+
+def test_bulk_unpublish_is_one_update(client, admin_client, make_posts):
+    posts = make_posts(3, is_published=True)
+    page = client.get(f'/posts/{posts[0].pk}/')
+    assert page.status_code == HTTPStatus.OK
+    client.get('/')
+
+    with CaptureQueriesContext(connection) as ctx:
+        admin_client.post(CHANGELIST_URL, {
+            'action': 'unpublish',
+            '_selected_action': [post.pk for post in posts],
+        })
+    updates = [
+        query['sql'] for query in ctx.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1, (
+        "Убедитесь, что снятие с публикации выполняется одним UPDATE."
+    )
+    assert not Post.objects.filter(is_published=True).exists()
+    assert client.get(
+        f'/posts/{posts[0].pk}/'
+    ).status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что массовые действия сбрасывают кеш страниц."
+    )
+    assert not client.get('/').context['page_obj']
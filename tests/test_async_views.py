@@ -0,0 +1,170 @@
+import asyncio
+import re
+from importlib import reload
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
+from django.urls import clear_url_caches
+from django.utils import timezone
+
+import blogicum.urls
+from blog import async_views, urls
+from blog.middleware import ServerTimingMiddleware
+from blog.models import Comment, Post
+
+# Запросы асинхронных представлений идут в других потоках и других
+# соединениях: данные теста должны быть зафиксированы в БД.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+QUERIES_RE = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def _aget(client, path):
+    async def get():
+        return await client.get(path)
+    return async_to_sync(get)()
+
+
+def _reload_urls():
+    reload(urls)
+    reload(blogicum.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def use_async_views(settings):
+    settings.BLOG_ASYNC_VIEWS = True
+    _reload_urls()
+    yield
+    settings.BLOG_ASYNC_VIEWS = False
+    _reload_urls()
+
+
+@pytest.fixture
+def blog_posts(mixer, user, another_user, published_category):
+    now = timezone.now()
+    posts = [
+        mixer.blend(
+            'blog.Post', author=author, category=published_category,
+            is_published=is_published,
+            pub_date=now - timezone.timedelta(days=days),
+        )
+        for days, (author, is_published) in enumerate(
+            [(user, True), (another_user, True), (user, False)] * 8
+        )
+    ]
+    mixer.cycle(3).blend('blog.Comment', post=posts[0], author=another_user)
+    return posts
+
+
+def _pages(user, paths):
+    """Списки постов и комментариев на страницах для обоих путей."""
+    sync_client, async_client = Client(), AsyncClient()
+    if user is not None:
+        sync_client.force_login(user)
+        async_client.force_login(user)
+    result = {}
+    for path in paths:
+        for name, response in (
+            ('sync', sync_client.get(path)),
+            ('async', _aget(async_client, path)),
+        ):
+            context = response.context
+            if response.status_code != 200:
+                result[path, name] = response.status_code
+            elif 'page_obj' in context:
+                result[path, name] = [post.pk for post in context['page_obj']]
+            else:
+                result[path, name] = [
+                    comment.pk for comment in context['comments']
+                ]
+    return result
+
+
+def test_async_views_match_sync(
+        use_async_views, blog_posts, user, another_user, published_category,
+        settings
+):
+    # Иначе второй путь получит страницу, закешированную первым.
+    settings.PAGE_CACHE_TIMEOUT = 0
+    post = blog_posts[0]
+    paths = [
+        '/', '/?page=2', '/?page=last', '/?page=9', f'/posts/{post.pk}/',
+        f'/posts/{blog_posts[2].pk}/', '/posts/0/',
+        f'/category/{published_category.slug}/', '/category/missing/',
+        f'/profile/{user.username}/', f'/profile/{user.username}/?page=2',
+        '/profile/missing/',
+    ]
+    assert async_views.index in [
+        pattern.callback for pattern in urls.urlpatterns
+    ]
+    for viewer in (None, user, another_user):
+        pages = _pages(viewer, paths)
+        for path in paths:
+            assert pages[path, 'async'] == pages[path, 'sync'], (
+                "Убедитесь, что асинхронные представления показывают те же"
+                f" записи и статусы, что и синхронные: {path}."
+            )
+
+
+def test_async_cursor_pagination(use_async_views, blog_posts, settings):
+    settings.BLOG_CURSOR_PAGINATION = True
+    client = AsyncClient()
+    first = _aget(client, '/')
+    page = first.context['page_obj']
+    assert page.has_next() and len(page) == 10
+    second = _aget(client, f'/?after={page.next_cursor}')
+    assert [post.pk for post in second.context['page_obj']] == [
+        post.pk for post in Post.objects.published()[10:20]
+    ]
+    assert _aget(client, '/?after=broken').status_code == 404
+
+
+def test_async_page_cache(use_async_views, blog_posts):
+    client = AsyncClient()
+    post = blog_posts[0]
+    first = _aget(client, f'/posts/{post.pk}/')
+    cached = _aget(client, f'/posts/{post.pk}/')
+    assert cached.content == first.content and cached.context is None, (
+        "Убедитесь, что асинхронные страницы для анонимов берутся из кеша."
+    )
+    Comment.objects.create(post=post, author=post.author, text='Новый')
+    fresh = _aget(client, f'/posts/{post.pk}/')
+    assert 'Новый' in fresh.content.decode()
+
+
+def test_async_conditional_get(use_async_views, blog_posts):
+    client = AsyncClient()
+    for path in ('/', f'/posts/{blog_posts[0].pk}/'):
+        etag = _aget(client, path)['ETag']
+
+        async def revalidate():
+            # AsyncClient в Django 3.2 берёт имена заголовков как есть.
+            return await client.get(path, **{'If-None-Match': etag})
+        assert async_to_sync(revalidate)().status_code == 304, (
+            "Убедитесь, что асинхронные представления отвечают 304 на"
+            " совпадающий If-None-Match."
+        )
+
+
+def test_async_server_timing_counts_thread_queries(
+        use_async_views, blog_posts, user
+):
+    client = AsyncClient()
+    client.force_login(user)
+    header = _aget(client, '/')['Server-Timing']
+    # Сессия, пользователь, подсчёт постов, страница постов и валидаторы
+    # условного GET.
+    assert QUERIES_RE.search(header).group(1) == '5', (
+        "Убедитесь, что Server-Timing учитывает запросы, выполненные"
+        " асинхронными представлениями в потоках."
+    )
+
+
+def test_middleware_is_async_capable():
+    async def get_response(request):
+        pass
+
+    assert asyncio.iscoroutinefunction(ServerTimingMiddleware(get_response))
+    assert not asyncio.iscoroutinefunction(ServerTimingMiddleware(print))
@@ -0,0 +1,73 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.management.commands.bulk_loaddata import iter_fixture
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_iter_fixture_small_chunks():
+    records = [{'model': 'blog.category', 'pk': i, 'fields': {
+        'title': f'Категория «{i}», [с] {{скобками}}',
+    }} for i in range(50)]
+    text = json.dumps(records, ensure_ascii=False, indent=2)
+    assert list(iter_fixture(StringIO(text), chunk_size=7)) == records, (
+        "Убедитесь, что iter_fixture восстанавливает записи, разбитые"
+        " границами прочитанных кусков."
+    )
+    assert list(iter_fixture(StringIO(' [ ] '))) == []
+
+
+def test_bulk_loaddata_matches_dumpdata(tmp_path):
+    call_command(
+        'seed_blog', users=5, categories=3, locations=2, posts=40,
+        comments_per_post=2, seed=3, stdout=StringIO(),
+    )
+    fixture = tmp_path / 'dump.json'
+    call_command(
+        'dumpdata', 'auth.user', 'blog', output=str(fixture),
+        stdout=StringIO(),
+    )
+    Post.objects.all().delete()
+    call_command('loaddata', str(fixture), stdout=StringIO())
+    expected = {
+        model: list(model.objects.order_by('pk').values())
+        for model in (Category, Location, Post, Comment)
+    }
+    Post.objects.all().delete()
+
+    out = StringIO()
+    call_command('bulk_loaddata', str(fixture), batch_size=7, stdout=out)
+    assert 'Загружено объектов' in out.getvalue()
+    for model, rows in expected.items():
+        assert list(model.objects.order_by('pk').values()) == rows, (
+            f"Убедитесь, что bulk_loaddata восстанавливает {model.__name__}"
+            " в точности как loaddata."
+        )
+
+    loaded = Post.objects.first()
+    post = Post.objects.create(
+        title='Новый', text='Текст', pub_date=loaded.pub_date,
+        author=loaded.author, category=loaded.category,
+    )
+    assert post.pk > max(row['id'] for row in expected[Post]), (
+        "Убедитесь, что после загрузки сбрасываются последовательности pk."
+    )
+
+
+@pytest.mark.parametrize('command', ('loaddata', 'bulk_loaddata'))
+def test_loads_repository_fixture(command, settings):
+    fixture = settings.BASE_DIR.parent / 'db.json'
+    call_command(command, str(fixture), stdout=StringIO())
+    posts = Post.objects.all()
+    assert posts.count() == 39, (
+        f"Убедитесь, что {command} загружает db.json из репозитория."
+    )
+    assert not posts.filter(updated_at__isnull=True).exists(), (
+        "Убедитесь, что постам из фикстур без updated_at проставляется"
+        " время изменения."
+    )
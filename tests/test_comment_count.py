@@ -0,0 +1,91 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _refreshed_count(post):
+    post.refresh_from_db(fields=['comment_count'])
+    return post.comment_count
+
+
+def test_comment_count_follows_views(
+        user_client, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    for _ in range(2):
+        user_client.post(
+            f'/posts/{post.id}/comment/', data={'text': 'Комментарий'}
+        )
+    assert _refreshed_count(post) == 2, (
+        "Убедитесь, что при добавлении комментария увеличивается счётчик"
+        " комментариев поста."
+    )
+    comment = CommentModel.objects.filter(post=post).first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    assert _refreshed_count(post) == 1, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " комментариев поста."
+    )
+
+
+def test_comment_count_follows_cascades(
+        mixer, another_user, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend(CommentModel, post=post, author=another_user)
+    mixer.blend(CommentModel, post=post)
+    assert _refreshed_count(post) == 4
+    CommentModel.objects.filter(post=post, author=another_user).delete()
+    assert _refreshed_count(post) == 1
+    post.comments.get().author.delete()
+    assert _refreshed_count(post) == 0
+
+
+def test_feed_does_not_touch_comment_table(
+        unlogged_client, post_with_published_location, CommentModel
+):
+    table = CommentModel._meta.db_table
+    with CaptureQueriesContext(connection) as ctx:
+        unlogged_client.get('/')
+    assert not [q for q in ctx.captured_queries if table in q['sql']], (
+        "Убедитесь, что лента не обращается к таблице комментариев."
+    )
+
+
+def test_reconcile_comment_counts(
+        mixer, post_with_published_location, PostModel, CommentModel
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend(CommentModel, post=post)
+    PostModel.objects.filter(pk=post.pk).update(comment_count=42)
+    out = StringIO()
+    call_command('reconcile_comment_counts', batch_size=1, stdout=out)
+    assert _refreshed_count(post) == 2
+    assert 'исправлено: 1' in out.getvalue()
+
+
+def test_post_delete_does_not_touch_each_comment(
+        mixer, user, published_category, PostModel, CommentModel
+):
+    def delete_queries(n_comments):
+        post = mixer.blend(
+            PostModel, author=user, category=published_category
+        )
+        CommentModel.objects.bulk_create(
+            CommentModel(post=post, author=user, text='Комментарий')
+            for _ in range(n_comments)
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            post.delete()
+        return len(ctx.captured_queries)
+
+    assert delete_queries(50) == delete_queries(1), (
+        "Убедитесь, что удаление поста не обновляет пост и не сбрасывает"
+        " кеш отдельно для каждого его комментария."
+    )
+    assert not CommentModel.objects.exists()
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+PER_PAGE = 5
+
+
+@pytest.fixture
+def comments(settings, published_post, user, another_user):
+    settings.COMMENTS_PER_PAGE = PER_PAGE
+    Comment.objects.bulk_create(
+        Comment(
+            post=published_post, author=(user, another_user)[number % 2],
+            text=f'Комментарий {number}',
+        )
+        for number in range(PER_PAGE * 2 + 2)
+    )
+    # Одинаковое время добавления: порядок задаёт `id`.
+    Comment.objects.filter(post=published_post).update(
+        created_at=timezone.now()
+    )
+    return list(Comment.objects.filter(post=published_post).order_by('id'))
+
+
+def _ids(response):
+    return [comment.pk for comment in response.context['comments']]
+
+
+def test_detail_shows_first_page(client, published_post, comments):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(f'/posts/{published_post.pk}/')
+    assert _ids(response) == [comment.pk for comment in comments[:PER_PAGE]], (
+        "Убедитесь, что страница поста показывает только первую порцию"
+        " комментариев в порядке добавления."
+    )
+    comment_queries = [
+        query['sql'] for query in ctx.captured_queries
+        if 'blog_comment' in query['sql']
+    ]
+    assert len(comment_queries) == 1 and 'LIMIT' in comment_queries[0], (
+        "Убедитесь, что комментарии читаются одним запросом с LIMIT."
+    )
+    assert 'data-load-comments' in response.content.decode()
+
+
+def test_fragment_loads_remaining_comments(client, published_post, comments):
+    detail = client.get(f'/posts/{published_post.pk}/')
+    next_cursor = detail.context['comments'].next_cursor
+    loaded = []
+    while next_cursor:
+        response = client.get(
+            f'/posts/{published_post.pk}/comments/', {'after': next_cursor}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert '<html' not in response.content.decode(), (
+            "Убедитесь, что подгрузка комментариев отдаёт фрагмент HTML."
+        )
+        loaded += _ids(response)
+        next_cursor = response.context['comments'].next_cursor
+    assert loaded == [comment.pk for comment in comments[PER_PAGE:]], (
+        "Убедитесь, что фрагменты подгружают остальные комментарии без"
+        " пропусков и повторов."
+    )
+
+
+def test_fragment_links_and_cache(
+        client, user_client, published_post, comments, user
+):
+    url = f'/posts/{published_post.pk}/comments/'
+    content = user_client.get(url).content.decode()
+    edit_url = f'/posts/{published_post.pk}/edit_comment/{comments[0].pk}/'
+    assert edit_url in content, (
+        "Убедитесь, что во фрагменте автору доступны ссылки на правку."
+    )
+    client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+    assert not ctx.captured_queries, (
+        "Убедитесь, что фрагмент для анонимов берётся из кеша."
+    )
+    Comment.objects.create(post=published_post, author=user, text='Свежий')
+    assert client.get(url).context is not None
+
+
+def test_fragment_respects_visibility(client, published_post, comments):
+    assert client.get(
+        f'/posts/{published_post.pk}/comments/', {'after': 'broken'}
+    ).status_code == HTTPStatus.NOT_FOUND
+    published_post.is_published = False
+    published_post.save()
+    assert client.get(
+        f'/posts/{published_post.pk}/comments/'
+    ).status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что комментарии скрытого поста недоступны."
+    )
@@ -0,0 +1,171 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.caches import dependency_versions
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_urls(published_post, user, published_category):
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+        f'/posts/{published_post.pk}/',
+    )
+
+
+def _revalidate(client, url, response):
+    with CaptureQueriesContext(connection) as ctx:
+        revalidated = client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+    return revalidated, len(ctx.captured_queries)
+
+
+def test_not_modified_with_one_query(client, feed_urls):
+    for url in feed_urls:
+        response = client.get(url)
+        assert response.has_header('ETag') and response.has_header(
+            'Last-Modified'
+        ), f"Убедитесь, что страница `{url}` отдаёт ETag и Last-Modified."
+        revalidated, n_queries = _revalidate(client, url, response)
+        assert revalidated.status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отвечает 304."
+        )
+        assert n_queries == 1 and not revalidated.content, (
+            "Убедитесь, что ответ 304 вычисляется одним запросом к БД без"
+            " рендера шаблона."
+        )
+
+        not_modified = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_cached_page_keeps_validators(client, published_post):
+    url = f'/posts/{published_post.pk}/'
+    first = client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        cached = client.get(url)
+    assert not ctx.captured_queries and cached['ETag'] == first['ETag'], (
+        "Убедитесь, что страница из кеша отдаётся с теми же валидаторами."
+    )
+
+
+def test_comment_activity_changes_post_validators(
+        client, published_post, user
+):
+    url = f'/posts/{published_post.pk}/'
+    before = client.get(url)
+    comment = Comment.objects.create(
+        post=published_post, author=user, text='Первый'
+    )
+    after = client.get(url, HTTP_IF_NONE_MATCH=before['ETag'])
+    assert after.status_code == HTTPStatus.OK and 'Первый' in (
+        after.content.decode()
+    ), "Убедитесь, что новый комментарий обновляет ETag страницы поста."
+
+    comment.text = 'Исправленный'
+    comment.save()
+    edited = client.get(url, HTTP_IF_NONE_MATCH=after['ETag'])
+    assert edited.status_code == HTTPStatus.OK
+
+    comment.delete()
+    deleted = client.get(url, HTTP_IF_NONE_MATCH=edited['ETag'])
+    assert deleted.status_code == HTTPStatus.OK
+
+
+def test_feed_validators_follow_changes(
+        client, mixer, published_post, user, published_category
+):
+    url = '/'
+    response = client.get(url)
+
+    published_category.title = 'Новое название'
+    published_category.save()
+    renamed = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert renamed.status_code == HTTPStatus.OK, (
+        "Убедитесь, что переименование категории меняет ETag ленты."
+    )
+
+    extra = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(),
+    )
+    added = client.get(url, HTTP_IF_NONE_MATCH=renamed['ETag'])
+    assert added.status_code == HTTPStatus.OK
+
+    extra.delete()
+    removed = client.get(url, HTTP_IF_NONE_MATCH=added['ETag'])
+    assert removed.status_code == HTTPStatus.OK, (
+        "Убедитесь, что удаление поста меняет ETag ленты."
+    )
+
+
+def test_post_deletion_changes_feed_last_modified(
+        client, mixer, published_post, user, published_category
+):
+    extra = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timezone.timedelta(1),
+    )
+    Post.objects.update(updated_at=timezone.now() - timezone.timedelta(1))
+    urls = (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    )
+    responses = {url: client.get(url) for url in urls}
+    extra.delete()
+    for url, response in responses.items():
+        revalidated = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert revalidated.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что после удаления поста лента `{url}` не отвечает"
+            " 304 на запрос только с If-Modified-Since."
+        )
+
+
+def test_only_displayed_fields_touch_posts(mixer, published_post, user):
+    def state():
+        published_post.refresh_from_db(fields=['updated_at'])
+        return published_post.updated_at, dependency_versions(['feed:authors'])
+
+    before = state()
+    user.first_name = 'Иван'
+    user.save()
+    mixer.blend('auth.User')
+    assert state() == before, (
+        "Убедитесь, что правка профиля без смены логина и регистрация"
+        " не обновляют посты и ленты."
+    )
+    user.username = 'renamed'
+    user.save()
+    after = state()
+    assert after[0] > before[0] and after[1] != before[1], (
+        "Убедитесь, что смена логина автора обновляет его посты и ленты."
+    )
+
+
+def test_validators_depend_on_user(client, user_client, published_post):
+    url = f'/posts/{published_post.pk}/'
+    anonymous = client.get(url)
+    logged_in = user_client.get(url, HTTP_IF_NONE_MATCH=anonymous['ETag'])
+    assert logged_in.status_code == HTTPStatus.OK, (
+        "Убедитесь, что ETag различается для анонимов и пользователей."
+    )
+
+
+def test_missing_pages_have_no_validators(client):
+    response = client.get('/posts/0/', HTTP_IF_NONE_MATCH='"post-0"')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert not response.has_header('ETag')
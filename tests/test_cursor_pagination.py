@@ -0,0 +1,73 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+CURSOR_LINK_RE = re.compile(r'href="\?(after|before)=([\w-]+)"')
+
+
+@pytest.fixture
+def cursor_posts(mixer: Mixer, user, published_category):
+    base = timezone.now() - timedelta(days=1)
+    # Часть постов делит одну дату публикации: порядок задаёт `id`.
+    pub_dates = (
+        base - timedelta(minutes=i // 3) for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=pub_dates,
+    )
+
+
+def _cursor_links(response):
+    return dict(CURSOR_LINK_RE.findall(response.content.decode('utf-8')))
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_pagination_walks_feed(user_client, cursor_posts):
+    expected = [
+        post.id for post in sorted(
+            cursor_posts, key=lambda p: (p.pub_date, p.id), reverse=True
+        )
+    ]
+    seen, pages, url = [], [], '/'
+    while url:
+        response = user_client.get(url)
+        assert response.status_code == 200
+        page_ids = [post.id for post in response.context['page_obj']]
+        assert len(page_ids) <= N_PER_PAGE
+        seen.extend(page_ids)
+        pages.append(page_ids)
+        links = _cursor_links(response)
+        url = f'/?after={links["after"]}' if 'after' in links else None
+    assert seen == expected, (
+        "Убедитесь, что при курсорной пагинации посты главной страницы"
+        " выводятся без пропусков и повторов, «от новых к старым»."
+    )
+
+    links = _cursor_links(response)
+    response = user_client.get(f'/?before={links["before"]}')
+    assert [post.id for post in response.context['page_obj']] == pages[-2], (
+        "Убедитесь, что ссылка на предыдущую страницу при курсорной"
+        " пагинации возвращает предыдущую страницу."
+    )
+
+
+def test_cursor_pagination_is_opt_in(user_client, cursor_posts):
+    response = user_client.get('/')
+    assert response.context['paginator'].count == len(cursor_posts)
+    assert 'page=2' in response.content.decode('utf-8')
+
+
+@pytest.mark.parametrize('token', ['garbage', 'WyJ4Il0', '!!'])
+def test_invalid_cursor_returns_404(user_client, cursor_posts, token):
+    assert user_client.get(f'/?after={token}').status_code == 404
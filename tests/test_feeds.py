@@ -0,0 +1,138 @@
+from http import HTTPStatus
+from xml.sax.saxutils import escape
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_urls(published_post, user, published_category):
+    return [
+        f'{prefix}{kind}/'
+        for prefix in (
+            '/', f'/category/{published_category.slug}/',
+            f'/profile/{user.username}/',
+        )
+        for kind in ('rss', 'atom')
+    ]
+
+
+def _get(client, url, **extra):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, **extra)
+    return response, len(ctx.captured_queries)
+
+
+def test_feeds_served(client, feed_urls, published_post):
+    for url in feed_urls:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что лента `{url}` доступна."
+        )
+        content_type = 'atom' if 'atom' in url else 'rss'
+        assert content_type in response['Content-Type'], (
+            f"Убедитесь, что лента `{url}` отдаётся в формате {content_type}."
+        )
+        assert escape(published_post.title) in response.content.decode()
+
+
+def test_repeated_poll_without_queries(client, feed_urls):
+    for url in feed_urls:
+        first = client.get(url)
+        second, n_queries = _get(client, url)
+        assert n_queries == 0 and second.content == first.content, (
+            f"Убедитесь, что повторный опрос ленты `{url}` не обращается"
+            " к БД."
+        )
+        revalidated, n_queries = _get(
+            client, url, HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        assert revalidated.status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что неизменившаяся лента `{url}` отвечает 304."
+        )
+        assert n_queries == 0
+        not_modified = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        )
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_post_changes_regenerate_feeds(client, feed_urls, published_post):
+    etags = {url: client.get(url)['ETag'] for url in feed_urls}
+    published_post.title = 'Исправленная запись'
+    published_post.save()
+    for url in feed_urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == HTTPStatus.OK and (
+            'Исправленная запись' in response.content.decode()
+        ), f"Убедитесь, что правка поста перестраивает ленту `{url}`."
+
+
+def test_comments_keep_feeds(client, feed_urls, published_post, user):
+    for url in feed_urls:
+        client.get(url)
+    Comment.objects.create(
+        post=published_post, author=user, text='Комментарий'
+    )
+    for url in feed_urls:
+        _, n_queries = _get(client, url)
+        assert n_queries == 0, (
+            "Убедитесь, что комментарии не перестраивают ленты."
+        )
+
+
+def test_category_rename_regenerates_feeds(
+        client, feed_urls, published_category
+):
+    for url in feed_urls:
+        client.get(url)
+    published_category.title = 'Новое название'
+    published_category.save()
+    for url in feed_urls:
+        assert 'Новое название' in client.get(url).content.decode(), (
+            "Убедитесь, что переименование категории перестраивает ленты."
+        )
+
+
+def test_post_moves_between_category_feeds(
+        client, mixer, published_post, published_category
+):
+    other = mixer.blend('blog.Category', is_published=True)
+    old_url = f'/category/{published_category.slug}/rss/'
+    new_url = f'/category/{other.slug}/rss/'
+    client.get(old_url)
+    client.get(new_url)
+    published_post.category = other
+    published_post.save()
+    title = escape(published_post.title)
+    assert title not in client.get(old_url).content.decode()
+    assert title in client.get(new_url).content.decode(), (
+        "Убедитесь, что перенос поста перестраивает ленты обеих категорий."
+    )
+
+
+def test_missing_feed_objects(client, mixer):
+    unpublished = mixer.blend('blog.Category', is_published=False)
+    for url in (
+        '/category/missing/rss/', f'/category/{unpublished.slug}/atom/',
+        '/profile/missing/rss/',
+    ):
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            f"Убедитесь, что лента `{url}` отвечает 404."
+        )
+
+
+def test_pages_link_feeds(client, published_post, published_category):
+    content = client.get(
+        f'/category/{published_category.slug}/'
+    ).content.decode()
+    assert f'/category/{published_category.slug}/rss/' in content
+    assert 'href="/rss/"' in content, (
+        "Убедитесь, что страницы ссылаются на ленты через"
+        ' <link rel="alternate">.'
+    )
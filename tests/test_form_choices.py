@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+REFERENCE_TABLES = ('"blog_category"', '"blog_location"')
+
+
+def _reference_queries(ctx):
+    return [
+        query['sql'] for query in ctx.captured_queries
+        if query['sql'].startswith('SELECT') and any(
+            table in query['sql'].split(' WHERE ')[0]
+            for table in REFERENCE_TABLES
+        )
+    ]
+
+
+def _form_data(category, location):
+    return {
+        'title': 'Заголовок', 'text': 'Текст',
+        'pub_date': '2020-01-01T10:00', 'category': category.pk,
+        'location': location.pk, 'is_published': True,
+    }
+
+
+def test_editor_reuses_cached_choices(
+        user_client, published_category, published_location
+):
+    user_client.get('/posts/create/')
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get('/posts/create/')
+    content = response.content.decode()
+    assert published_category.title in content
+    assert published_location.name in content
+    assert not _reference_queries(ctx), (
+        "Убедитесь, что списки категорий и местоположений формы поста"
+        " берутся из кеша, а не из БД."
+    )
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.post(
+            '/posts/create/',
+            _form_data(published_category, published_location)
+        )
+    assert response.status_code == HTTPStatus.FOUND
+    assert not _reference_queries(ctx), (
+        "Убедитесь, что выбранные категория и местоположение проверяются"
+        " по кешу."
+    )
+    post = Post.objects.get()
+    assert post.category_id == published_category.pk
+    assert post.location_id == published_location.pk
+
+
+def test_choices_follow_changes(user_client, mixer, published_category):
+    user_client.get('/posts/create/')
+    published_category.title = 'Переименованная'
+    published_category.save()
+    location = mixer.blend('blog.Location', name='Новое место')
+    content = user_client.get('/posts/create/').content.decode()
+    assert 'Переименованная' in content and 'Новое место' in content, (
+        "Убедитесь, что правка категорий и местоположений обновляет списки"
+        " в форме поста."
+    )
+    assert user_client.post('/posts/create/', _form_data(
+        published_category, location
+    )).status_code == HTTPStatus.FOUND
+
+
+def test_unknown_choice_rejected(
+        user_client, published_category, published_location
+):
+    data = _form_data(published_category, published_location)
+    for changes in ({'category': 0}, {'location': 'x'}):
+        response = user_client.post('/posts/create/', {**data, **changes})
+        assert response.status_code == HTTPStatus.OK and (
+            response.context['form'].errors
+        ), "Убедитесь, что форма отклоняет несуществующие варианты."
+    assert not Post.objects.exists()
+    response = user_client.post('/posts/create/', {**data, 'location': ''})
+    assert response.status_code == HTTPStatus.FOUND, (
+        "Убедитесь, что местоположение можно не указывать."
+    )
@@ -0,0 +1,158 @@
+from io import StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+from PIL import Image
+
+from blog.models import Post
+from conftest import make_image, process_image_jobs
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures('media_root')]
+
+
+@pytest.fixture
+def image_post(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image=make_image((1600, 800), orientation=6),
+    )
+    process_image_jobs()
+    post.refresh_from_db()
+    return post
+
+
+def test_derivatives_generated_on_upload(image_post):
+    derivatives = Post.objects.get(pk=image_post.pk).image_derivatives
+    # Ориентация 6 — поворот на 90°: портрет 800×1600.
+    assert (derivatives['width'], derivatives['height']) == (800, 1600), (
+        "Убедитесь, что при создании копий применяется ориентация из EXIF."
+    )
+    for key, extension, pil_format in (
+        ('webp', '.webp', 'WEBP'), ('jpeg', '.jpg', 'JPEG')
+    ):
+        assert [width for width, _ in derivatives[key]] == [
+            320, 640, 800
+        ], (
+            "Убедитесь, что копии создаются для всех ширин меньше оригинала"
+            " и в ширину оригинала, если он уже самой крупной копии."
+        )
+        for width, name in derivatives[key]:
+            assert name.endswith(extension)
+            with default_storage.open(name) as file, Image.open(file) as img:
+                assert img.format == pil_format
+                assert img.size == (width, width * 2)
+
+
+def test_small_and_transparent_images(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=make_image((100, 60), name='logo.png', mode='RGBA'),
+    )
+    process_image_jobs()
+    post.refresh_from_db()
+    assert [width for width, _ in post.image_derivatives['jpeg']] == [100]
+
+
+def test_wide_image_keeps_configured_widths(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=make_image((1200, 600)),
+    )
+    process_image_jobs()
+    post.refresh_from_db()
+    assert [width for width, _ in post.image_derivatives['webp']] == [
+        320, 640, 960
+    ], (
+        "Убедитесь, что для оригинала шире самой крупной копии создаются"
+        " только копии настроенных ширин."
+    )
+
+
+def _derivative_names(post):
+    return [
+        name for key in ('webp', 'jpeg')
+        for _, name in post.image_derivatives[key]
+    ]
+
+
+def test_derivatives_replaced_and_deleted(
+        image_post, django_capture_on_commit_callbacks
+):
+    old_names = _derivative_names(image_post)
+    image_post.image = make_image((700, 700), name='second.jpg')
+    with django_capture_on_commit_callbacks(execute=True):
+        image_post.save()
+    assert not any(default_storage.exists(name) for name in old_names), (
+        "Убедитесь, что копии прежнего изображения удаляются."
+    )
+    process_image_jobs()
+    image_post.refresh_from_db()
+    assert image_post.image_derivatives['width'] == 700
+    new_names = [name for _, name in image_post.image_derivatives['webp']]
+
+    image_post.title = 'Без смены изображения'
+    image_post.save()
+    assert all(default_storage.exists(name) for name in new_names)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        image_post.delete()
+    assert not any(default_storage.exists(name) for name in new_names)
+
+
+def test_derivatives_kept_on_rollback(image_post):
+    names = _derivative_names(image_post)
+    with pytest.raises(RuntimeError), transaction.atomic():
+        image_post.image = make_image((700, 700), name='second.jpg')
+        image_post.save()
+        raise RuntimeError
+    with pytest.raises(RuntimeError), transaction.atomic():
+        image_post.delete()
+        raise RuntimeError
+    assert all(default_storage.exists(name) for name in names), (
+        "Убедитесь, что копии удаляются только после фиксации транзакции."
+    )
+
+
+def _main(client):
+    content = client.get(reverse('blog:index')).content
+    return BeautifulSoup(content, 'html.parser').find('main')
+
+
+def test_card_uses_srcset(client, image_post):
+    main = _main(client)
+    picture = main.find('picture')
+    assert picture is not None and len(main.find_all('img')) == 1
+    source = picture.find('source', type='image/webp')
+    assert '320w' in source['srcset'] and '640w' in source['srcset']
+    img = picture.find('img')
+    assert img['srcset'].count('.jpg') == 3 and img['sizes']
+    assert img['src'].endswith('-640.jpg'), (
+        "Убедитесь, что карточка в ленте ссылается на уменьшенные копии, а не"
+        " на оригинал."
+    )
+    assert img.parent.parent['href'] == image_post.image.url
+
+    detail = client.get(reverse('blog:post_detail', args=[image_post.pk]))
+    assert f'src="{image_post.image.url}"' in detail.content.decode(), (
+        "Убедитесь, что страница поста показывает оригинал изображения."
+    )
+
+
+def test_card_without_derivatives_falls_back(client, image_post):
+    Post.objects.filter(pk=image_post.pk).update(image_derivatives={})
+    assert _main(client).find('img')['src'] == image_post.image.url
+
+
+def test_backfill_command(image_post):
+    Post.objects.filter(pk=image_post.pk).update(image_derivatives={})
+    call_command('generate_image_derivatives', stdout=StringIO())
+    process_image_jobs()
+    derivatives = Post.objects.get(pk=image_post.pk).image_derivatives
+    assert [width for width, _ in derivatives['webp']] == [320, 640, 800], (
+        "Убедитесь, что команда создаёт копии для уже загруженных"
+        " изображений."
+    )
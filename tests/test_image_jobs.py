@@ -0,0 +1,151 @@
+import os
+from datetime import timedelta
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import image_jobs
+from blog.image_jobs import (
+    MAX_ATTEMPTS,
+    PENDING_DERIVATIVES,
+    STALE_AFTER,
+    claim_jobs,
+    finish_job,
+    process_image,
+)
+from blog.models import ImageJob, Post
+from conftest import make_image, process_image_jobs
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures('media_root')]
+
+
+def crashing_process_image(name):
+    # Выполняется в дочернем процессе пула, как и process_image.
+    if 'crash' in name:
+        os._exit(1)
+    return process_image(name)
+
+
+@pytest.fixture
+def uploaded_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image=make_image((800, 600)),
+    )
+
+
+def _card_img(client):
+    content = client.get(reverse('blog:index')).content
+    return BeautifulSoup(content, 'html.parser').find('main').find('img')
+
+
+def test_upload_is_queued_not_processed(client, uploaded_post):
+    uploaded_post.refresh_from_db()
+    assert uploaded_post.image_derivatives == PENDING_DERIVATIVES, (
+        "Убедитесь, что копии изображения не создаются во время запроса."
+    )
+    job = ImageJob.objects.get(post=uploaded_post)
+    assert (job.status, job.image) == (
+        ImageJob.Status.PENDING, uploaded_post.image.name
+    )
+    assert _card_img(client)['src'].endswith('image-pending.svg'), (
+        "Убедитесь, что до обработки карточка показывает заглушку."
+    )
+
+    process_image_jobs()
+    job.refresh_from_db()
+    assert job.status == ImageJob.Status.DONE and job.attempts == 1
+    assert _card_img(client)['src'].endswith('-640.jpg'), (
+        "Убедитесь, что после обработки страницы кеша показывают копии."
+    )
+
+
+def test_replacing_image_supersedes_job(uploaded_post):
+    uploaded_post.title = 'Без смены изображения'
+    uploaded_post.save()
+    assert ImageJob.objects.filter(post=uploaded_post).count() == 1
+
+    uploaded_post.image = make_image((900, 600), name='second.jpg')
+    uploaded_post.save()
+    jobs = ImageJob.objects.filter(post=uploaded_post)
+    assert list(jobs.values_list('image', flat=True)) == [
+        uploaded_post.image.name
+    ], "Убедитесь, что ждущее задание прежнего файла снимается."
+
+
+def test_stale_result_is_discarded(uploaded_post, tmp_path):
+    [job] = claim_jobs(10)
+    assert claim_jobs(10) == [], (
+        "Убедитесь, что захваченное задание не выдаётся повторно."
+    )
+    derivatives = process_image(job.image)
+    uploaded_post.image = make_image((900, 600), name='second.jpg')
+    uploaded_post.save()
+
+    finish_job(job, derivatives)
+    assert Post.objects.get(pk=uploaded_post.pk).image_derivatives == (
+        PENDING_DERIVATIVES
+    )
+    assert not (tmp_path / derivatives['jpeg'][0][1]).exists(), (
+        "Убедитесь, что копии заменённого изображения удаляются."
+    )
+
+
+def test_abandoned_jobs_are_reclaimed(uploaded_post):
+    [job] = claim_jobs(10)
+    ImageJob.objects.filter(pk=job.pk).update(
+        started_at=timezone.now() - STALE_AFTER - timedelta(seconds=1)
+    )
+    assert [reclaimed.pk for reclaimed in claim_jobs(10)] == [job.pk]
+
+    ImageJob.objects.filter(pk=job.pk).update(
+        started_at=timezone.now() - STALE_AFTER - timedelta(seconds=1),
+        attempts=MAX_ATTEMPTS,
+    )
+    assert claim_jobs(10) == []
+    job.refresh_from_db()
+    assert job.status == ImageJob.Status.FAILED, (
+        "Убедитесь, что брошенное задание, исчерпавшее попытки, помечается"
+        " как неудавшееся."
+    )
+    assert Post.objects.get(pk=uploaded_post.pk).image_derivatives == {}, (
+        "Убедитесь, что пост неудавшегося задания не остаётся с заглушкой."
+    )
+
+
+def test_pool_crash_charges_only_crashing_job(
+        monkeypatch, uploaded_post, mixer, user, published_category
+):
+    monkeypatch.setattr(
+        image_jobs, 'process_image', crashing_process_image
+    )
+    crashing = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=make_image((800, 600), name='crash.jpg'),
+    )
+    process_image_jobs()
+    done = ImageJob.objects.get(post=uploaded_post)
+    assert (done.status, done.attempts) == (ImageJob.Status.DONE, 1), (
+        "Убедитесь, что падение процесса пула не тратит попытки заданий,"
+        " которые его не вызывали."
+    )
+    failed = ImageJob.objects.get(post=crashing)
+    assert (failed.status, failed.attempts) == (
+        ImageJob.Status.FAILED, MAX_ATTEMPTS
+    )
+    assert Post.objects.get(pk=crashing.pk).image_derivatives == {}
+
+
+def test_unreadable_upload_fails_job(client, uploaded_post):
+    broken = uploaded_post
+    broken.image = ContentFile(b'not an image', name='broken.jpg')
+    broken.save()
+
+    process_image_jobs()
+    job = ImageJob.objects.get(image=broken.image.name)
+    assert job.status == ImageJob.Status.FAILED and job.error
+    assert Post.objects.get(pk=broken.pk).image_derivatives == {}
+    assert _card_img(client)['src'] == broken.image.url
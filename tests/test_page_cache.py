@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.content.decode('utf-8'), len(ctx.captured_queries)
+
+
+def _page_urls(post):
+    return (
+        '/', f'/category/{post.category.slug}/', f'/posts/{post.id}/'
+    )
+
+
+def test_anonymous_pages_are_cached(
+        unlogged_client, post_with_published_location
+):
+    for url in _page_urls(post_with_published_location):
+        _get(unlogged_client, url)
+        _, n_queries = _get(unlogged_client, url)
+        assert n_queries == 0, (
+            f"Убедитесь, что повторный анонимный запрос `{url}` отдаётся"
+            " из кеша без обращений к БД."
+        )
+
+
+def test_logged_in_pages_are_not_cached(
+        user_client, post_with_published_location
+):
+    _get(user_client, '/')
+    _, n_queries = _get(user_client, '/')
+    assert n_queries > 0
+
+
+@pytest.mark.parametrize('change', ['post', 'category', 'location', 'comment'])
+def test_page_cache_invalidation(
+        mixer, unlogged_client, another_user, post_with_published_location,
+        CommentModel, change
+):
+    post = post_with_published_location
+    for url in _page_urls(post):
+        _get(unlogged_client, url)
+
+    if change == 'post':
+        post.title = expected = 'Обновлённый заголовок'
+        post.save()
+    elif change == 'category':
+        post.category.title = expected = 'Обновлённая категория'
+        post.category.save()
+    elif change == 'location':
+        post.location.name = expected = 'Обновлённое место'
+        post.location.save()
+    else:
+        mixer.blend(CommentModel, post=post, author=another_user)
+        expected = f'({post.comments.count()})'
+
+    urls = _page_urls(post)[:2] if change == 'comment' else _page_urls(post)
+    for url in urls:
+        content, _ = _get(unlogged_client, url)
+        assert expected in content, (
+            f"Убедитесь, что кеш страницы `{url}` сбрасывается при изменении"
+            " связанных с ней объектов."
+        )
+
+
+def test_scheduled_post_is_not_delayed_by_cache(
+        monkeypatch, mixer, unlogged_client, user, published_category
+):
+    from blog import mixins
+
+    timeouts = []
+    store_page = mixins.store_page
+
+    def spy_store_page(key, response, versions, timeout):
+        timeouts.append(timeout)
+        store_page(key, response, versions, timeout)
+
+    monkeypatch.setattr(mixins, 'store_page', spy_store_page)
+    mixer.blend('blog.Post', author=user, category=published_category)
+    future_post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(minutes=2),
+    )
+    content, _ = _get(unlogged_client, '/')
+    assert future_post.title not in content
+    assert timeouts and timeouts[0] <= 120, (
+        "Убедитесь, что страница ленты хранится в кеше не дольше, чем до"
+        " ближайшей отложенной публикации."
+    )
+
+
+def _category_queries(client, url, expected_status):
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url).status_code == expected_status
+    return [
+        q for q in ctx.captured_queries
+        if 'FROM "blog_category"' in q['sql']
+    ]
+
+
+def test_category_resolved_from_cache(
+        user_client, post_with_published_location, mixer
+):
+    category = post_with_published_location.category
+    unpublished = mixer.blend('blog.Category', is_published=False)
+    url = f'/category/{category.slug}/'
+    _category_queries(user_client, url, 200)
+    for page_url, status in (
+        (url, 200),
+        ('/category/no-such-slug/', 404),
+        (f'/category/{unpublished.slug}/', 404),
+    ):
+        assert not _category_queries(user_client, page_url, status), (
+            "Убедитесь, что категория по slug берётся из кеша, в том числе"
+            " для неизвестных и снятых с публикации категорий."
+        )
+
+    category.is_published = False
+    category.save()
+    assert user_client.get(url).status_code == 404
+
+
+def test_published_categories_kept_in_process(
+        post_with_published_location, monkeypatch
+):
+    from django.core.cache import cache
+
+    from blog.caches import get_published_category
+
+    category = post_with_published_location.category
+    get_published_category(category.slug)
+    read_keys = []
+    original_get_many = cache.get_many
+    original_get = cache.get
+
+    def get_many(keys, *args, **kwargs):
+        read_keys.extend(keys)
+        return original_get_many(keys, *args, **kwargs)
+
+    def get(key, *args, **kwargs):
+        read_keys.append(key)
+        return original_get(key, *args, **kwargs)
+
+    monkeypatch.setattr(cache, 'get_many', get_many)
+    monkeypatch.setattr(cache, 'get', get)
+    assert get_published_category(category.slug) == category
+    assert set(read_keys) == {'page_dependency:choices:category'}, (
+        "Убедитесь, что опубликованные категории хранятся в памяти"
+        " процесса, а из общего кеша читается только версия зависимости."
+    )
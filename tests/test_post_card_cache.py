@@ -0,0 +1,34 @@
+import pytest
+
+from blog.caches import post_card_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_cache_hits_and_invalidation(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get('/')
+    hits, misses = post_card_stats['hits'], post_card_stats['misses']
+    content = user_client.get('/').content.decode('utf-8')
+    assert post_card_stats['hits'] == hits + 1, (
+        "Убедитесь, что при повторном показе ленты карточка поста берётся"
+        " из кеша."
+    )
+    assert post_card_stats['misses'] == misses
+    assert post.title in content
+
+    for obj, field, value in (
+        (post, 'title', 'Новый заголовок поста'),
+        (post.category, 'title', 'Новое название категории'),
+        (post.location, 'name', 'Новое название места'),
+        (post.author, 'username', 'renamed_author'),
+    ):
+        setattr(obj, field, value)
+        obj.save()
+        content = user_client.get('/').content.decode('utf-8')
+        assert value in content, (
+            "Убедитесь, что кеш карточки поста сбрасывается при изменении"
+            " поста, его категории, местоположения и автора."
+        )
@@ -0,0 +1,158 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+# Запросы страницы ленты: сессия и пользователь (для авторизованного
+# клиента), категория/профиль, COUNT пагинатора и сама страница постов.
+FEED_QUERY_BUDGET = 6
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx.captured_queries)
+
+
+def _feed_urls(user, category):
+    return (
+        '/',
+        f'/category/{category.slug}/',
+        f'/profile/{user.username}/',
+    )
+
+
+@pytest.fixture
+def feed_category(mixer: Mixer):
+    return mixer.blend('blog.Category', is_published=True)
+
+
+def _blend_posts(mixer, user, category, n):
+    return mixer.cycle(n).blend(
+        'blog.Post',
+        author=user,
+        category=category,
+        location=lambda: mixer.blend('blog.Location', is_published=True),
+    )
+
+
+# Бюджет относится к сборке страницы: полностраничный кеш отключён.
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+@pytest.mark.parametrize('client_fixture', ['user_client', 'unlogged_client'])
+def test_feed_query_count_does_not_grow_with_page_size(
+        request, mixer, user, feed_category, client_fixture
+):
+    client = request.getfixturevalue(client_fixture)
+    _blend_posts(mixer, user, feed_category, 1)
+    # Прогрев: справочные данные (категории) кешируются первым запросом.
+    for url in _feed_urls(user, feed_category):
+        client.get(url)
+    small_page = {
+        url: _count_queries(client, url)
+        for url in _feed_urls(user, feed_category)
+    }
+    _blend_posts(mixer, user, feed_category, N_PER_PAGE * 2)
+    for url in _feed_urls(user, feed_category):
+        n_queries = _count_queries(client, url)
+        assert n_queries == small_page[url], (
+            f"Убедитесь, что число запросов к БД на странице `{url}` не"
+            " зависит от количества публикаций на странице."
+        )
+        assert n_queries <= FEED_QUERY_BUDGET, (
+            f"Убедитесь, что страница `{url}` загружается не более чем за"
+            f" {FEED_QUERY_BUDGET} запросов к БД."
+        )
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+@pytest.mark.parametrize(
+    ('client_fixture', 'expected_queries'),
+    [('user_client', 4), ('another_user_client', 4), ('unlogged_client', 2)],
+)
+def test_post_detail_query_count(
+        request, post_with_published_location, client_fixture,
+        expected_queries
+):
+    client = request.getfixturevalue(client_fixture)
+    n_queries = _count_queries(
+        client, f'/posts/{post_with_published_location.id}/'
+    )
+    assert n_queries == expected_queries, (
+        "Убедитесь, что пост со связанными объектами загружается на странице"
+        " публикации одним запросом."
+    )
+
+
+def test_visible_to(
+        user, another_user, post_with_published_location,
+        unpublished_posts_with_published_locations, PostModel
+):
+    from django.contrib.auth.models import AnonymousUser
+
+    hidden_ids = {
+        post.id for post in unpublished_posts_with_published_locations
+    }
+    visible = set(
+        PostModel.objects.visible_to(user).values_list('id', flat=True)
+    )
+    assert hidden_ids <= visible, (
+        "Убедитесь, что автору доступны все его публикации."
+    )
+    for viewer in (another_user, AnonymousUser()):
+        visible = set(
+            PostModel.objects.visible_to(viewer).values_list('id', flat=True)
+        )
+        assert visible == {post_with_published_location.id}, (
+            "Убедитесь, что остальным пользователям доступны только"
+            " опубликованные посты."
+        )
+
+
+def _table_queries(client, url, table):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [
+        q for q in ctx.captured_queries if f'FROM "{table}"' in q['sql']
+    ]
+
+
+def test_author_pages_load_object_once(
+        user_client, post_with_published_location, comment_to_a_post,
+        PostModel, CommentModel, user
+):
+    post = post_with_published_location
+    comment = comment_to_a_post
+    comment.author = user
+    comment.save()
+    for url, model in (
+        (f'/posts/{post.id}/edit/', PostModel),
+        (f'/posts/{post.id}/delete/', PostModel),
+        (f'/posts/{post.id}/edit_comment/{comment.id}/', CommentModel),
+        (f'/posts/{post.id}/delete_comment/{comment.id}/', CommentModel),
+    ):
+        queries = _table_queries(user_client, url, model._meta.db_table)
+        assert len(queries) == 1, (
+            f"Убедитесь, что страница `{url}` загружает объект одним"
+            " запросом вместе с проверкой авторства."
+        )
+        assert 'author_id' in queries[0]['sql']
+
+
+def test_author_only_pages_for_other_users(
+        another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    response = another_user_client.get(f'/posts/{post.id}/edit/')
+    assert response.status_code == 302
+    assert response['Location'] == f'/posts/{post.id}/'
+    response = another_user_client.get(f'/posts/{post.id + 1000}/edit/')
+    assert response.status_code == 404
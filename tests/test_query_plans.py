@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+from blog.paginators import CursorPaginator
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='EXPLAIN QUERY PLAN есть только в SQLite',
+    ),
+]
+
+BAD_PLAN_STEPS = ('SCAN', 'USE TEMP B-TREE')
+
+
+@pytest.fixture
+def plan_posts(mixer, user, published_category):
+    return mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category
+    )
+
+
+def _query_plan(queryset):
+    sql, params = queryset[:10].query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _access_paths(user, category, post):
+    paginator = CursorPaginator(Post.objects.feed(), 10)
+    cursor_values = paginator.decode_cursor(paginator.encode_cursor(post))
+    return {
+        'published()': Post.objects.published(),
+        'with_related()': Post.objects.with_related().published(),
+        'feed()': Post.objects.feed(),
+        'feed() по курсору': Post.objects.feed().filter(
+            paginator._seek(cursor_values, forward=True)
+        ),
+        # get() сбрасывает сортировку, как и get_object_or_404().
+        'visible_to() по pk': Post.objects.visible_to(user).filter(
+            pk=post.pk
+        ).order_by(),
+        'feed() категории': category.post_set.feed(),
+        'feed() профиля': user.post_set.feed(),
+        'feed(only_published=False) профиля': user.post_set.feed(
+            only_published=False
+        ),
+        'комментарии поста': Comment.objects.filter(post=post)
+        .select_related('author').order_by('created_at', 'id'),
+    }
+
+
+def test_access_paths_use_indexes(user, published_category, plan_posts):
+    access_paths = _access_paths(user, published_category, plan_posts[0])
+    for name, queryset in access_paths.items():
+        plan = _query_plan(queryset)
+        bad_steps = [
+            step for step in plan if step.startswith(BAD_PLAN_STEPS)
+        ]
+        assert not bad_steps, (
+            f"Запрос `{name}` выполняет полный просмотр таблицы или"
+            f" сортировку во временном B-дереве: {plan}."
+        )
+
+
+def test_feed_freshness_uses_indexes(plan_posts):
+    with CaptureQueriesContext(connection) as ctx:
+        Post.objects.freshness()
+    [query] = ctx.captured_queries
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+        plan = [row[-1] for row in cursor.fetchall()]
+    assert not [step for step in plan if step.startswith(BAD_PLAN_STEPS)], (
+        "Убедитесь, что валидаторы лент вычисляются поиском по индексам,"
+        f" без просмотра таблицы постов: {plan}."
+    )
@@ -0,0 +1,109 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.routers import ReplicaRouter
+
+# Реплика в тестах — зеркало `default` со своим соединением: данные
+# теста должны быть зафиксированы, чтобы она их видела.
+pytestmark = [
+    pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+]
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ('replica', )
+    settings.PAGE_CACHE_TIMEOUT = 0
+
+
+def _post_queries(client_get, *args, **kwargs):
+    """Запросы к таблице постов по алиасам баз."""
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica']) as replica:
+        response = client_get(*args, **kwargs)
+    return response, {
+        alias: [
+            query['sql'] for query in ctx.captured_queries
+            if 'blog_post' in query['sql']
+        ]
+        for alias, ctx in (('default', primary), ('replica', replica))
+    }
+
+
+def test_read_views_use_replica(replicas, client, published_post, user):
+    for url in (
+        '/', f'/posts/{published_post.pk}/', f'/profile/{user.username}/',
+        f'/category/{published_post.category.slug}/',
+    ):
+        response, queries = _post_queries(client.get, url)
+        assert response.status_code == 200
+        assert queries['replica'] and not queries['default'], (
+            f"Убедитесь, что страница `{url}` читает посты с реплики."
+        )
+
+
+def test_pages_read_from_replica_are_not_cached(
+        replicas, settings, client, published_post
+):
+    settings.PAGE_CACHE_TIMEOUT = 60
+    client.get('/')
+    _, queries = _post_queries(client.get, '/')
+    assert queries['replica'], (
+        "Убедитесь, что страница, прочитанная с реплики, не сохраняется в"
+        " кеш страниц: реплика могла отстать от версий зависимостей."
+    )
+
+
+def test_other_views_use_primary(replicas, client, published_post):
+    _, queries = _post_queries(
+        client.get, '/search/', {'q': published_post.title}
+    )
+    assert queries['default'] and not queries['replica'], (
+        "Убедитесь, что страницы вне REPLICA_READ_VIEWS читают из основной"
+        " базы."
+    )
+
+
+def test_reads_stick_to_primary_after_write(
+        replicas, settings, user_client, published_category
+):
+    response, queries = _post_queries(user_client.post, '/posts/create/', {
+        'title': 'Новый пост', 'text': 'Текст',
+        'pub_date': '2020-01-01T10:00', 'category': published_category.pk,
+    })
+    assert response.status_code == 302 and queries['default']
+    assert not [sql for sql in queries['replica'] if 'INSERT' in sql]
+    assert settings.REPLICA_PIN_COOKIE in response.cookies, (
+        "Убедитесь, что после записи ставится cookie чтения из основной"
+        " базы."
+    )
+
+    _, queries = _post_queries(user_client.get, '/')
+    assert queries['default'] and not queries['replica'], (
+        "Убедитесь, что после записи пользователь читает из основной базы."
+    )
+
+
+def test_async_handler_uses_replica(replicas, published_post):
+    client = AsyncClient()
+    _, queries = _post_queries(async_to_sync(client.get), '/')
+    assert queries['replica'] and not queries['default'], (
+        "Убедитесь, что под ASGI страницы тоже читают с реплики."
+    )
+
+
+def test_without_replicas_everything_reads_primary(client, published_post):
+    _, queries = _post_queries(client.get, '/')
+    assert queries['default'] and not queries['replica']
+
+
+def test_writes_go_to_primary(replicas, published_post):
+    router = ReplicaRouter()
+    replica_post = Post.objects.using('replica').get(pk=published_post.pk)
+    assert router.db_for_write(Post, instance=replica_post) == 'default'
+    assert router.allow_relation(replica_post, published_post)
+    assert router.allow_migrate('replica', 'blog') is False
@@ -0,0 +1,144 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(user, published_category):
+    def make(title, text='', **kwargs):
+        return Post.objects.create(
+            title=title, text=text, author=user,
+            category=published_category,
+            pub_date=kwargs.pop('pub_date', timezone.now()), **kwargs
+        )
+    return make
+
+
+def _titles(queryset):
+    return [post.title for post in queryset]
+
+
+def test_search_matches_title_and_text(make_post):
+    make_post('Блины на Масленицу', 'Рецепт теста')
+    make_post('Обед', 'Пекли БЛИНЧИКИ с икрой')
+    make_post('Прогулка', 'Ничего съедобного')
+    assert set(_titles(Post.objects.search('блин'))) == {
+        'Блины на Масленицу', 'Обед'
+    }, (
+        "Убедитесь, что поиск находит слова по префиксу без учёта регистра"
+        " и в заголовке, и в тексте поста."
+    )
+    assert _titles(Post.objects.search('блин рецепт')) == [
+        'Блины на Масленицу'
+    ]
+    assert not Post.objects.search('  ').exists()
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Ранжирование FTS5 есть в SQLite'
+)
+def test_search_is_ranked(make_post):
+    make_post('Поход', 'Один раз вспомнили про костёр')
+    make_post('Костёр', 'Костёр, костёр и снова костёр')
+    assert _titles(Post.objects.search('костёр'))[0] == 'Костёр', (
+        "Убедитесь, что результаты поиска упорядочены по релевантности."
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Ранжирование FTS5 есть в SQLite'
+)
+def test_search_ranks_newest_visible_candidates(make_post, monkeypatch):
+    monkeypatch.setattr('blog.querysets.SEARCH_CANDIDATES_LIMIT', 2)
+    oldest = make_post('Костёр костёр костёр')
+    make_post('Костёр')
+    make_post('Снова костёр')
+    assert oldest not in Post.objects.search('костёр'), (
+        "Убедитесь, что ранжируются только самые новые совпадения."
+    )
+    assert Post.objects.search('костёр').count() == 2
+    for _ in range(3):
+        make_post('Скрытый костёр', is_published=False)
+    assert set(_titles(
+        Post.objects.visible_to(AnonymousUser()).search('костёр')
+    )) == {'Костёр', 'Снова костёр'}, (
+        "Убедитесь, что новые скрытые посты не вытесняют из результатов"
+        " поиска видимые."
+    )
+
+
+@pytest.mark.parametrize('query', [
+    '"', 'блины OR', 'NEAR(a b)', '*', 'title:блины', 'блины AND -',
+])
+def test_search_ignores_query_syntax(make_post, query):
+    make_post('Блины')
+    list(Post.objects.search(query))
+
+
+def test_search_index_follows_changes(make_post):
+    post = make_post('Старый заголовок')
+    post.title = 'Новый заголовок'
+    post.save()
+    assert not Post.objects.search('старый').exists()
+    assert Post.objects.search('новый').get() == post
+    post.delete()
+    assert not Post.objects.search('новый').exists(), (
+        "Убедитесь, что индекс поиска обновляется при изменении и удалении"
+        " постов."
+    )
+
+
+def test_search_view_visibility(
+        make_post, client, user_client, another_user_client
+):
+    make_post('Секретные блины', is_published=False)
+    make_post('Будущие блины', pub_date=timezone.now()
+              + timezone.timedelta(days=1))
+    make_post('Обычные блины')
+    url = reverse('blog:search') + '?q=блины'
+    for visitor, expected in (
+        (client, {'Обычные блины'}),
+        (another_user_client, {'Обычные блины'}),
+        (user_client, {'Обычные блины', 'Секретные блины', 'Будущие блины'}),
+    ):
+        response = visitor.get(url)
+        assert response.status_code == 200
+        assert set(_titles(response.context['page_obj'])) == expected, (
+            "Убедитесь, что поиск показывает только опубликованные посты"
+            " и, кроме них, неопубликованные посты автора."
+        )
+
+
+def test_search_view_paginates(make_post, client):
+    for number in range(15):
+        make_post(f'Блины {number}')
+    response = client.get(reverse('blog:search'), {'q': 'блины'})
+    assert len(response.context['page_obj']) == 10
+    assert 'q=%D0%B1%D0%BB%D0%B8%D0%BD%D1%8B&amp;page=2' in (
+        response.content.decode()
+    ), "Убедитесь, что ссылки пагинатора поиска сохраняют запрос."
+    response = client.get(reverse('blog:search'), {'q': 'блины', 'page': 2})
+    assert len(response.context['page_obj']) == 5
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN есть в SQLite'
+)
+def test_search_uses_fts_index(user):
+    sql, params = Post.objects.visible_to(user).search(
+        'блины'
+    )[:10].query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        steps = [row[-1] for row in cursor.fetchall()]
+    assert steps[0].startswith('SCAN blog_post_fts VIRTUAL TABLE'), steps
+    assert not any(
+        step.startswith('SCAN') and 'VIRTUAL TABLE' not in step
+        for step in steps
+    ), f"Убедитесь, что поиск не просматривает таблицы целиком: {steps}"
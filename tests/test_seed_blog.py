@@ -0,0 +1,61 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_seed_blog(django_user_model):
+    call_command(
+        'seed_blog', users=20, categories=4, locations=3, posts=200,
+        comments_per_post=2, future_fraction=0.1, unpublished_fraction=0.1,
+        unpublished_categories=0.5, batch_size=37, seed=1, stdout=StringIO(),
+    )
+    assert django_user_model.objects.count() == 20
+    assert Category.objects.count() == 4
+    assert Location.objects.count() == 3
+    assert Post.objects.count() == 200
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists()
+    assert Post.objects.filter(is_published=False).exists()
+
+    stored = dict(Post.objects.values_list('pk', 'comment_count'))
+    actual = dict(
+        Comment.objects.order_by().values_list('post')
+        .annotate(total=Count('pk'))
+    )
+    assert sum(stored.values()) == Comment.objects.count() > 0
+    assert all(actual.get(pk, 0) == n for pk, n in stored.items()), (
+        "Убедитесь, что seed_blog заполняет Post.comment_count в"
+        " соответствии с созданными комментариями."
+    )
+
+
+def test_seed_blog_appends_to_existing_data(django_user_model):
+    options = dict(
+        users=5, categories=2, locations=2, posts=10, stdout=StringIO()
+    )
+    call_command('seed_blog', **options)
+    call_command('seed_blog', **options)
+    assert Post.objects.count() == 20
+    assert django_user_model.objects.count() == 10
+
+
+def test_seeded_posts_are_searchable():
+    call_command(
+        'seed_blog', users=3, categories=2, locations=2, posts=30,
+        stdout=StringIO(),
+    )
+    post = Post.objects.order_by('pk').last()
+    assert Post.objects.search(post.title).filter(pk=post.pk).exists(), (
+        "Убедитесь, что посты seed_blog попадают в полнотекстовый индекс."
+    )
+    post.title = 'Переименованная публикация'
+    post.save()
+    assert Post.objects.search('переименованная').get() == post, (
+        "Убедитесь, что после seed_blog триггеры индекса восстановлены."
+    )
@@ -0,0 +1,36 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+TIMING_RE = re.compile(r'(\w+);dur=([\d.]+)')
+
+
+def test_server_timing_header(user_client, post_with_published_location):
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get('/')
+    header = response.get('Server-Timing', '')
+    metrics = dict(TIMING_RE.findall(header))
+    assert {'db', 'tpl', 'view', 'total'} <= metrics.keys(), (
+        "Убедитесь, что ответ содержит заголовок Server-Timing с временем"
+        " SQL, рендера шаблонов, представления и всего запроса."
+    )
+    assert f'"{len(ctx.captured_queries)} queries"' in header
+    assert float(metrics['total']) >= float(metrics['tpl'])
+    assert 'cards;desc="0 hits, 1 misses"' in header
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+def test_server_timing_sampling(user_client):
+    assert 'Server-Timing' not in user_client.get('/')
+
+
+@override_settings(SERVER_TIMING_LOG=True)
+def test_server_timing_log(user_client, caplog):
+    with caplog.at_level('INFO', logger='blog.timing'):
+        user_client.get('/pages/about/')
+    assert '"path": "/pages/about/"' in caplog.text
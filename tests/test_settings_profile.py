@@ -0,0 +1,166 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.exceptions import ImproperlyConfigured
+
+from blog.checks import check_performance_settings, ensure_fast_settings
+
+MEMCACHED = 'django.core.cache.backends.memcached.PyLibMCCache'
+
+PRODUCTION_ENV = {
+    'BLOGICUM_ENV': 'production',
+    'DJANGO_SECRET_KEY': 'production-secret',
+    'DJANGO_ALLOWED_HOSTS': 'blogicum.example,www.blogicum.example',
+}
+
+FAST_SETTINGS = {
+    'DEBUG': False,
+    'CACHES': {'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': '127.0.0.1:11211',
+    }},
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'STATICFILES_STORAGE': (
+        'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+    ),
+    'SERVER_TIMING_SAMPLE_RATE': 0.01,
+}
+
+
+def _load_settings(**env):
+    """Настройки, как их видит новый процесс с заданным окружением."""
+    script = (
+        'import json; from blogicum import settings as s; print(json.dumps({'
+        '"DEBUG": s.DEBUG, "SECRET_KEY": s.SECRET_KEY,'
+        ' "ALLOWED_HOSTS": s.ALLOWED_HOSTS, "CACHES": s.CACHES,'
+        ' "SESSION_ENGINE": s.SESSION_ENGINE,'
+        ' "STATICFILES_STORAGE": getattr(s, "STATICFILES_STORAGE", None),'
+        ' "CONN_MAX_AGE": s.DATABASES["default"]["CONN_MAX_AGE"],'
+        ' "SQLITE_PRAGMAS": s.SQLITE_PRAGMAS,'
+        ' "TEMPLATES": s.TEMPLATES}, default=str))'
+    )
+    return json.loads(_run_python(script, **env))
+
+
+def _run_python(script, **env):
+    clean_env = {
+        key: value for key, value in os.environ.items()
+        if not key.startswith(('BLOGICUM_', 'DJANGO_'))
+    }
+    return subprocess.run(
+        [sys.executable, '-c', script], check=True, capture_output=True,
+        text=True, cwd=django_settings.BASE_DIR, env={
+            **clean_env, 'DJANGO_SETTINGS_MODULE': 'blogicum.settings',
+            **env,
+        },
+    ).stdout
+
+
+def _ids(messages):
+    return {message.id for message in messages}
+
+
+def test_production_profile():
+    loaded = _load_settings(**PRODUCTION_ENV)
+    assert not loaded['DEBUG'], (
+        "Убедитесь, что профиль production выключает DEBUG."
+    )
+    assert loaded['SECRET_KEY'] == 'production-secret'
+    assert loaded['ALLOWED_HOSTS'] == [
+        'blogicum.example', 'www.blogicum.example'
+    ]
+    options = loaded['TEMPLATES'][0]['OPTIONS']
+    assert options['loaders'][0][0] == (
+        'django.template.loaders.cached.Loader'
+    ), "Убедитесь, что в профиле production шаблоны кешируются."
+    assert 'django.template.context_processors.debug' not in (
+        options['context_processors']
+    )
+    assert 'locmem' not in loaded['CACHES']['default']['BACKEND']
+    assert loaded['SESSION_ENGINE'].endswith('cached_db')
+    assert 'Manifest' in loaded['STATICFILES_STORAGE']
+    assert loaded['CONN_MAX_AGE'] > 0
+    assert loaded['SQLITE_PRAGMAS']['journal_mode'] == 'wal'
+
+
+def test_production_cache_backend_builds():
+    # Значения настроек ещё не доказывают, что бэкенд установлен:
+    # клиент кеша создаётся при первом обращении.
+    try:
+        output = _run_python(
+            'import django; django.setup();'
+            ' from django.core.cache import caches;'
+            ' cache = caches["default"]; cache.close();'
+            ' print(type(cache).__name__)',
+            **PRODUCTION_ENV,
+        )
+    except subprocess.CalledProcessError as error:
+        raise AssertionError(
+            "Убедитесь, что библиотека кеша профиля production есть в"
+            f" requirements.txt:\n{error.stderr}"
+        ) from error
+    assert output.strip() == 'PyMemcacheCache'
+
+
+def test_environment_overrides_profile():
+    loaded = _load_settings(
+        **PRODUCTION_ENV,
+        BLOGICUM_CACHE_BACKEND=MEMCACHED,
+        BLOGICUM_CACHE_LOCATION='cache:11211',
+        BLOGICUM_CONN_MAX_AGE='30',
+    )
+    assert loaded['CACHES']['default'] == {
+        'BACKEND': MEMCACHED, 'LOCATION': 'cache:11211',
+    }
+    assert loaded['CONN_MAX_AGE'] == 30
+
+
+def test_development_is_default():
+    loaded = _load_settings()
+    assert loaded['DEBUG'] and 'locmem' in (
+        loaded['CACHES']['default']['BACKEND']
+    )
+    assert not loaded['SQLITE_PRAGMAS'], (
+        "Убедитесь, что прагмы SQLite задаются только профилем production."
+    )
+
+
+def test_check_reports_slow_settings(settings):
+    settings.DEBUG = True
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0], 'OPTIONS': {
+            **settings.TEMPLATES[0]['OPTIONS'], 'debug': True,
+        },
+    }]
+    database = settings.DATABASES['default']
+    conn_max_age, database['CONN_MAX_AGE'] = database['CONN_MAX_AGE'], 0
+    try:
+        ids = _ids(check_performance_settings(None))
+    finally:
+        database['CONN_MAX_AGE'] = conn_max_age
+    assert {'blog.E001', 'blog.E002', 'blog.E003', 'blog.E004'} <= ids, (
+        "Убедитесь, что проверка performance находит DEBUG, шаблоны без"
+        " кеширования, кеш в памяти процесса и соединения без"
+        " CONN_MAX_AGE."
+    )
+    assert {'blog.W001', 'blog.W002', 'blog.W003'} <= ids
+
+
+def test_check_accepts_fast_settings(settings):
+    for name, value in FAST_SETTINGS.items():
+        setattr(settings, name, value)
+    assert not check_performance_settings(None)
+
+
+def test_production_refuses_slow_settings(settings):
+    ensure_fast_settings()
+    settings.BLOGICUM_ENV = 'production'
+    with pytest.raises(ImproperlyConfigured, match='blog.E003'):
+        ensure_fast_settings()
+    for name, value in FAST_SETTINGS.items():
+        setattr(settings, name, value)
+    ensure_fast_settings()
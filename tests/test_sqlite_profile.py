@@ -0,0 +1,72 @@
+import sqlite3
+import time
+
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _pragma(wrapper, name):
+    return wrapper.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+@pytest.fixture
+def file_connections(tmp_path, settings):
+    """Два соединения к файловой базе, как у двух рабочих процессов."""
+    settings.SQLITE_PRAGMAS = settings.PRODUCTION_SQLITE_PRAGMAS
+    wrappers = [
+        DatabaseWrapper({
+            **connection.settings_dict, 'NAME': str(tmp_path / 'blog.db')
+        }, alias=f'file_{number}')
+        for number in range(2)
+    ]
+    for wrapper in wrappers:
+        wrapper.ensure_connection()
+    yield wrappers
+    for wrapper in wrappers:
+        wrapper.close()
+
+
+def test_pragmas_applied(file_connections, settings):
+    wrapper = file_connections[0]
+    assert _pragma(wrapper, 'journal_mode') == 'wal', (
+        "Убедитесь, что в профиле production соединения SQLite переводят"
+        " базу в режим WAL."
+    )
+    assert _pragma(wrapper, 'synchronous') == 1
+    assert _pragma(wrapper, 'busy_timeout') == (
+        settings.SQLITE_PRAGMAS['busy_timeout']
+    )
+    assert _pragma(wrapper, 'cache_size') == (
+        settings.SQLITE_PRAGMAS['cache_size']
+    )
+    assert settings.DATABASES['default']['CONN_MAX_AGE'] > 0, (
+        "Убедитесь, что соединения с базой переиспользуются между запросами."
+    )
+
+
+def test_pragmas_not_counted_as_queries(file_connections):
+    wrapper = file_connections[0]
+    assert not wrapper.queries_log
+
+
+def test_reads_not_blocked_by_write(file_connections):
+    writer, reader = file_connections
+    writer.connection.execute('CREATE TABLE post (id INTEGER PRIMARY KEY)')
+    writer.connection.execute('INSERT INTO post VALUES (1)')
+    writer.connection.commit()
+    writer.connection.execute('BEGIN EXCLUSIVE')
+    writer.connection.execute('INSERT INTO post VALUES (2)')
+    reader.connection.execute('PRAGMA busy_timeout = 0')
+    started = time.perf_counter()
+    try:
+        rows = reader.connection.execute('SELECT id FROM post').fetchall()
+    except sqlite3.OperationalError as error:
+        raise AssertionError(
+            "Убедитесь, что чтение не ждёт незавершённой записи."
+        ) from error
+    finally:
+        writer.connection.rollback()
+    assert rows == [(1, )] and time.perf_counter() - started < 1